@@ -0,0 +1,157 @@
+# base_out.py - Bitmask base-out state and precomputed runner transition tables
+from typing import Dict, List, Optional, Tuple
+
+from schema import RunnerMovement
+
+# Occupancy bits: bit 0 = first, bit 1 = second, bit 2 = third
+BASE_NAMES = ("first", "second", "third")
+BASE_INDEX = {name: i for i, name in enumerate(BASE_NAMES)}
+
+# Move endpoints besides base indexes 0-2
+BATTER = -1
+HOME = 3
+OUT = 4
+
+# Each move is (from, to): from is a base index or BATTER, to is a base index, HOME or OUT
+Move = Tuple[int, int]
+# (occupancy after the play, runs scored, moves)
+Transition = Tuple[int, int, Tuple[Move, ...]]
+
+NUM_STATES = 24  # 8 occupancy masks x 0-2 outs
+
+
+def encode_state(mask: int, outs: int) -> int:
+    """Pack occupancy and outs into one small integer: outs * 8 + mask."""
+    return outs * 8 + mask
+
+
+def decode_state(state: int) -> Tuple[int, int]:
+    """Inverse of encode_state: (mask, outs)."""
+    return state & 7, state >> 3
+
+
+def mask_of(slots: List[Optional[str]]) -> int:
+    return (slots[0] is not None) | (slots[1] is not None) << 1 | (slots[2] is not None) << 2
+
+
+def _runners(mask: int) -> List[int]:
+    """Occupied base indexes, lead runner first."""
+    return [i for i in (2, 1, 0) if mask >> i & 1]
+
+
+def _finish(mask: int, moves: List[Move]) -> Transition:
+    """Occupancy and runs after moves; runners not listed in moves stay where they are."""
+    new_mask = mask
+    for start, _end in moves:
+        if start != BATTER:
+            new_mask &= ~(1 << start)
+    runs = 0
+    for _start, end in moves:
+        if end == HOME:
+            runs += 1
+        elif end < 3:
+            new_mask |= 1 << end
+    return new_mask, runs, tuple(moves)
+
+
+def _advance(mask: int, bases: int) -> Transition:
+    """Batter takes `bases` bases and every runner moves up the same number."""
+    moves = [(i, min(i + bases, HOME)) for i in _runners(mask)]
+    moves.append((BATTER, min(bases - 1, HOME)))
+    return _finish(mask, moves)
+
+
+def _force(mask: int) -> Transition:
+    """Batter to first, runners move up only when forced (walk, hit by pitch)."""
+    moves = []
+    for i in range(3):
+        if not mask >> i & 1:
+            break
+        moves.append((i, i + 1))
+    moves.reverse()
+    moves.append((BATTER, 0))
+    return _finish(mask, moves)
+
+
+def _force_out(mask: int) -> Optional[Transition]:
+    """
+    Fielder's choice force play: the runner from first is out at second,
+    the batter reaches first and any other forced runner moves up.
+    Undefined when first base is empty.
+    """
+    if not mask & 1:
+        return None
+    _new_mask, _runs, moves = _force(mask)
+    return _finish(mask, [(start, OUT if start == 0 else end) for start, end in moves])
+
+
+def _batter_out(mask: int) -> Transition:
+    """Batter retired, runners hold."""
+    return _finish(mask, [(BATTER, OUT)])
+
+
+def _build_tables() -> Dict[str, List[Optional[Transition]]]:
+    tables = {
+        "walk": [_force(m) for m in range(8)],
+        "single": [_advance(m, 1) for m in range(8)],
+        "double": [_advance(m, 2) for m in range(8)],
+        "triple": [_advance(m, 3) for m in range(8)],
+        "home_run": [_advance(m, 4) for m in range(8)],
+        "fielder_choice": [_force_out(m) for m in range(8)],
+        "batter_out": [_batter_out(m) for m in range(8)],
+    }
+    tables["hit_by_pitch"] = tables["walk"]
+    return tables
+
+
+# TRANSITIONS[play_type][mask] -> Transition (None when the play type can't happen from mask)
+TRANSITIONS = _build_tables()
+
+END_NAMES = {HOME: "home", OUT: "out"}
+
+
+def end_name(end: int) -> str:
+    return BASE_NAMES[end] if end < 3 else END_NAMES[end]
+
+
+def outs_on(transition: Transition) -> int:
+    """Outs recorded by a transition's moves."""
+    return sum(1 for _start, end in transition[2] if end == OUT)
+
+
+def apply_moves(slots: List[Optional[str]], moves: Tuple[Move, ...], batter: Optional[str]) -> List[Optional[str]]:
+    """Runner names on first/second/third after moves (the slot array beside the mask)."""
+    new_slots = list(slots)
+    for start, _end in moves:
+        if start != BATTER:
+            new_slots[start] = None
+    for start, end in moves:
+        if end < 3:
+            new_slots[end] = batter if start == BATTER else slots[start]
+    return new_slots
+
+
+def default_runner_movements(
+    play_type: str, slots: List[Optional[str]], batter: Optional[str]
+) -> Optional[Tuple[List[RunnerMovement], int]]:
+    """
+    Runner movements implied by play_type from the current bases, for plays
+    where the parser gave none. Returns (movements, runs) or None when the
+    play type has no default transition from this base state.
+    """
+    table = TRANSITIONS.get(play_type)
+    if table is None:
+        return None
+    transition = table[mask_of(slots)]
+    if transition is None:
+        return None
+
+    movements = [
+        RunnerMovement(
+            player=batter if start == BATTER else slots[start],
+            start_base="none" if start == BATTER else BASE_NAMES[start],
+            end_base=end_name(end),
+        )
+        for start, end in transition[2]
+    ]
+    return movements, transition[1]
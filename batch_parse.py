@@ -0,0 +1,211 @@
+# batch_parse.py - Parse many archived transcripts per LLM request for offline re-scoring
+import argparse
+import json
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from gamestate import GameState
+from llm_backend import get_llm
+from parse_play import PROMPT_TEMPLATE, format_context, parse_transcript
+from schema import Play
+from tracing import span, traced
+
+# parse_play's rules and examples, and its closing reminders, around the batch of transcripts
+RULES = PROMPT_TEMPLATE.split("\nGAME STATE BEFORE THIS PLAY (bases:")[0] + "\n"
+REMINDERS = PROMPT_TEMPLATE.split('"{transcript}"')[1]
+
+BATCH_INSTRUCTIONS = """NOW PARSE EACH OF THESE {n} TRANSCRIPTS. Each one is numbered and follows the game state before it
+(bases: 1/2/3 = occupied, - = empty).
+
+{items}
+
+Answer with ONE JSON array of {n} objects, one per transcript, in any order. Each object has the
+transcript's number as an integer "index" field plus the Play fields described above. Output only the array.
+"""
+
+
+def _rules() -> str:
+    """RULES formatted as the single-call prompt is, so escaped braces reach the model as plain ones."""
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    format_instructions = PydanticOutputParser(pydantic_object=Play).get_format_instructions()
+    return PromptTemplate.from_template(RULES).format(format_instructions=format_instructions)
+
+
+def build_prompt(transcripts: Sequence[str], contexts: Sequence[str]) -> str:
+    items = "\n".join(
+        f'{i}. [{context}] "{transcript}"' for i, (transcript, context) in enumerate(zip(transcripts, contexts))
+    )
+    return _rules() + BATCH_INSTRUCTIONS.format(n=len(transcripts), items=items) + REMINDERS
+
+
+def parse_response(text: str, n: int) -> Dict[int, Play]:
+    """
+    Plays from a batch response by their "index". Items that are missing, out
+    of range, repeated or don't validate as a Play are left out.
+    """
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        return {}
+    try:
+        items = json.loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    plays: Dict[int, Play] = {}
+    repeated = set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or not isinstance(item.get("index"), int):
+            continue
+        index = item.pop("index")
+        if not 0 <= index < n:
+            continue
+        if index in plays:
+            repeated.add(index)
+            continue
+        try:
+            plays[index] = Play.model_validate(item)
+        except ValueError:
+            continue
+    for index in repeated:
+        del plays[index]
+    return plays
+
+
+@traced("parse_batch")
+def parse_batch(
+    transcripts: Sequence[str],
+    contexts: Optional[Sequence[str]] = None,
+    model: Optional[str] = None,
+) -> Tuple[List[Play], int]:
+    """
+    Parse transcripts in one LLM request; contexts are the format_context()
+    of the game before each one. Items the response gets wrong are parsed
+    again one at a time. Returns the plays in input order and how many fell back.
+    """
+    contexts = contexts or ["unknown"] * len(transcripts)
+    try:
+        response = get_llm(model).complete(build_prompt(transcripts, contexts))
+        parsed = parse_response(response, len(transcripts))
+    except Exception:
+        parsed = {}
+
+    plays = []
+    fallbacks = 0
+    for i, (transcript, context) in enumerate(zip(transcripts, contexts)):
+        play = parsed.get(i)
+        if play is None:
+            fallbacks += 1
+            with span("parse_batch_fallback"):
+                play = parse_transcript(transcript, context, model)
+        play.raw_transcript = transcript
+        plays.append(play)
+    return plays, fallbacks
+
+
+def _with_contexts(simulated) -> Iterator[Tuple[str, str]]:
+    """Simulated plays as (transcript, context), one GameState session per half-inning as in context_eval.py."""
+    game = None
+    current = None
+    for item in simulated:
+        if (item.game, item.inning, item.top) != current:
+            game = GameState(home_team="HOME", away_team="AWAY")
+            current = (item.game, item.inning, item.top)
+        yield item.transcript, format_context(game)
+        game.apply_unchecked(item.play)
+
+
+def archive_items(paths: Sequence[str]) -> Iterator[Tuple[str, str]]:
+    """
+    (transcript, context) pairs from saved games (gamestate.json) or simulator
+    corpora (simulator.py --out). The context comes from replaying the
+    archived plays, so every transcript gets the state it was announced in.
+    """
+    from simulator import load_corpus
+
+    for path in paths:
+        if path.endswith(".jsonl"):
+            yield from _with_contexts(load_corpus(path))
+            continue
+
+        with open(path) as f:
+            history = json.load(f).get("history", [])
+        game = GameState(home_team="HOME", away_team="AWAY")
+        for data in history:
+            play = Play.model_validate(data)
+            if play.raw_transcript:
+                yield play.raw_transcript, format_context(game)
+            game.apply_unchecked(play)
+
+
+def benchmark(items: List[Tuple[str, str]], batch_sizes: Sequence[int], model: Optional[str] = None) -> List[dict]:
+    """
+    Plays/sec of single-call parsing and of each batch size over the same
+    items, with fallbacks and how often the batch play_type matches the single-call one.
+    """
+    transcripts = [t for t, _c in items]
+    contexts = [c for _t, c in items]
+
+    # Build the chain and load the model before timing
+    parse_transcript(*items[0], model)
+    get_llm(model)
+
+    start = time.perf_counter()
+    single = [parse_transcript(t, c, model) for t, c in items]
+    elapsed = time.perf_counter() - start
+    results = [
+        {"mode": "single", "seconds": elapsed, "plays_per_second": len(items) / elapsed, "fallbacks": 0, "agreement": 1.0}
+    ]
+
+    for size in batch_sizes:
+        plays: List[Play] = []
+        fallbacks = 0
+        start = time.perf_counter()
+        for i in range(0, len(items), size):
+            batch, failed = parse_batch(transcripts[i : i + size], contexts[i : i + size], model)
+            plays.extend(batch)
+            fallbacks += failed
+        elapsed = time.perf_counter() - start
+        agreement = sum(a.play_type == b.play_type for a, b in zip(single, plays)) / len(items)
+        results.append(
+            {
+                "mode": f"batch {size}",
+                "seconds": elapsed,
+                "plays_per_second": len(items) / elapsed,
+                "fallbacks": fallbacks,
+                "agreement": agreement,
+            }
+        )
+    return results
+
+
+def print_report(results: List[dict]):
+    print(f"{'mode':<10} {'seconds':>8} {'plays/s':>8} {'fallbacks':>10} {'same type':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<10} {r['seconds']:>8.1f} {r['plays_per_second']:>8.2f} "
+            f"{r['fallbacks']:>10} {r['agreement']:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Compare batched and single-call LLM parsing over archived transcripts"
+    )
+    arg_parser.add_argument("archives", nargs="*", help="Saved games or simulator corpora (default: simulate)")
+    arg_parser.add_argument("--plays", type=int, default=40, help="Transcripts to parse")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    arg_parser.add_argument("--model", help="Model to use (default: SARG_LLM_MODEL)")
+    args = arg_parser.parse_args()
+
+    if args.archives:
+        items = list(archive_items(args.archives))[: args.plays]
+    else:
+        from simulator import GameSimulator
+
+        items = list(_with_contexts(GameSimulator(args.seed).plays(args.plays)))
+    if not items:
+        raise SystemExit("No transcripts to parse")
+    print_report(benchmark(items, args.batch_sizes, args.model))
@@ -0,0 +1,112 @@
+# batch_validate.py - Vectorized validation of play batches for bulk imports and replays
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, get_args
+
+import numpy as np
+
+from gamestate import MAX_OUTS, REQUIRED_OUTS, VALID_END_BASES, VALID_START_BASES, validate_play_fields
+from schema import Play
+
+PLAY_TYPES = get_args(Play.model_fields["play_type"].annotation)
+PLAY_TYPE_CODES = {name: code for code, name in enumerate(PLAY_TYPES)}
+START_BASE_CODES = {name: code for code, name in enumerate(VALID_START_BASES)}
+END_BASE_CODES = {name: code for code, name in enumerate(VALID_END_BASES)}
+
+# Special codes: missing play type, unrecognized value, padding for plays with fewer runners
+MISSING = -1
+UNKNOWN = -2
+PADDING = -3
+
+# Required outs_made per play type code, -1 where any number is allowed
+REQUIRED_OUTS_BY_CODE = np.full(len(PLAY_TYPES), -1, dtype=np.int16)
+for _name, _outs in REQUIRED_OUTS.items():
+    REQUIRED_OUTS_BY_CODE[PLAY_TYPE_CODES[_name]] = _outs
+
+
+@dataclass
+class PlayBatch:
+    """Plays encoded column-wise as integer arrays."""
+
+    play_type: np.ndarray  # (n,) code into PLAY_TYPES, MISSING or UNKNOWN
+    outs_made: np.ndarray  # (n,)
+    runs_scored: np.ndarray  # (n,)
+    start_bases: np.ndarray  # (n, max_runners) code into VALID_START_BASES, UNKNOWN or PADDING
+    end_bases: np.ndarray  # (n, max_runners) code into VALID_END_BASES, UNKNOWN or PADDING
+    plays: Sequence[Play]  # the encoded plays, for the messages of failed rows
+
+    def __len__(self):
+        return len(self.play_type)
+
+
+def encode_plays(plays: Sequence[Play]) -> PlayBatch:
+    """Encode plays into a PlayBatch. Non-integer outs/runs become -1 and fail validation."""
+    n = len(plays)
+    play_type = np.fromiter(
+        (PLAY_TYPE_CODES.get(p.play_type, UNKNOWN) if p.play_type else MISSING for p in plays),
+        dtype=np.int16,
+        count=n,
+    )
+    outs_made = np.fromiter(
+        (p.outs_made if isinstance(p.outs_made, int) else -1 for p in plays), dtype=np.int64, count=n
+    )
+    runs_scored = np.fromiter(
+        (p.runs_scored if isinstance(p.runs_scored, int) else -1 for p in plays), dtype=np.int64, count=n
+    )
+
+    # Runner columns are gathered flat and scattered into the padded 2-D arrays at once
+    rows, cols, starts, ends = [], [], [], []
+    start_code = START_BASE_CODES.get
+    end_code = END_BASE_CODES.get
+    for i, play in enumerate(plays):
+        for j, move in enumerate(play.runners):
+            rows.append(i)
+            cols.append(j)
+            starts.append(start_code(move.start_base or "none", UNKNOWN))
+            ends.append(end_code(move.end_base or "none", UNKNOWN))
+    max_runners = max(cols) + 1 if cols else 0
+    start_bases = np.full((n, max_runners), PADDING, dtype=np.int8)
+    end_bases = np.full((n, max_runners), PADDING, dtype=np.int8)
+    start_bases[rows, cols] = starts
+    end_bases[rows, cols] = ends
+
+    return PlayBatch(play_type, outs_made, runs_scored, start_bases, end_bases, plays)
+
+
+def validate_batch(batch: PlayBatch, outs_before: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Apply the GameState.validate_play rules to every play at once.
+
+    outs_before (optional) holds the outs in the inning before each play and
+    enables the "too many outs" check. Returns a boolean mask of valid plays and,
+    per row, the reason the play is invalid (None for valid plays). The rules are
+    evaluated with NumPy; the reasons of the rows that fail them come from
+    validate_play_fields itself, so they match the single-play validator.
+    """
+    n = len(batch)
+    reasons: List[Optional[str]] = [None] * n
+
+    known = batch.play_type >= 0
+    required = np.full(n, -1, dtype=np.int16)
+    required[known] = REQUIRED_OUTS_BY_CODE[batch.play_type[known]]
+
+    invalid = (
+        (batch.play_type == MISSING)
+        | (batch.outs_made < 0)
+        | (batch.outs_made > MAX_OUTS)
+        | (batch.runs_scored < 0)
+        | ((required >= 0) & (batch.outs_made != required))
+    )
+    if batch.start_bases.shape[1]:
+        invalid |= (batch.start_bases == UNKNOWN).any(axis=1) | (batch.end_bases == UNKNOWN).any(axis=1)
+
+    for i in np.flatnonzero(invalid):
+        reasons[i] = validate_play_fields(batch.plays[i])[1]
+    mask = ~invalid
+
+    if outs_before is not None:
+        too_many = mask & (outs_before + batch.outs_made > MAX_OUTS)
+        for i in np.flatnonzero(too_many):
+            reasons[i] = f"Too many outs: current={outs_before[i]}, play adds={batch.outs_made[i]}"
+        mask &= ~too_many
+
+    return mask, reasons
@@ -0,0 +1,246 @@
+# benchmark.py - End-to-end pipeline benchmark over a corpus of recorded clips
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+from ollama_stub import OllamaStub
+from tracing import Span, peak_rss_bytes, tracer
+
+RESULTS_DIR = "bench_results"
+
+logger = logging.getLogger(__name__)
+
+# Play fields compared against the golden labels when they are present there
+SCORED_FIELDS = [
+    "play_type",
+    "batter",
+    "hit_type",
+    "hit_direction",
+    "outs_made",
+    "runs_scored",
+    "balls",
+    "strikes",
+    "outs_after_play",
+    "at_bat_complete",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def process_clip(game, clip: str):
+    """Run one clip through the same steps as main.py. Returns the last applied Play or None."""
+    from multi_play import parse_plays
+    from speech import attach_transcription, clean_transcript, standardize_transcript, transcribe_with_details
+
+    transcription = transcribe_with_details(clip)
+    transcript = standardize_transcript(clean_transcript(transcription.text))
+    if "undo" in transcript.lower():
+        game.undo_last_play()
+        return None
+
+    plays = parse_plays(transcript, game, transcription.segments)
+    for play in plays:
+        attach_transcription(play, transcription, clip)
+    game.apply_plays(plays)
+    return plays[-1]
+
+
+def score_play(play, golden: dict) -> Dict[str, bool]:
+    """Per-field match of a parsed play against its golden Play JSON."""
+    if play is None:
+        return {name: False for name in SCORED_FIELDS if name in golden}
+    return {
+        name: getattr(play, name) == golden[name]
+        for name in SCORED_FIELDS
+        if name in golden
+    }
+
+
+def run_benchmark(clips: List[str], golden: Optional[Dict[str, dict]] = None, repeat: int = 1) -> dict:
+    """
+    Replay the clip corpus through the pipeline repeat times, each time as a fresh game.
+    Returns per-stage latency percentiles, throughput, peak memory and accuracy.
+    """
+    from gamestate import GameState
+
+    spans: List[Span] = []
+    tracer.listeners.append(spans.append)
+    field_hits: Dict[str, List[bool]] = {}
+    exact_matches = []
+    failures = 0
+    errors: Dict[str, int] = {}
+
+    start = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            game = GameState(home_team="HOME", away_team="AWAY")
+            for index, clip in enumerate(clips):
+                tracer.set_play(index)
+                try:
+                    with tracer.span("play_total"):
+                        play = process_clip(game, clip)
+                except Exception as e:
+                    failures += 1
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    logger.warning("%s failed: %s: %s", os.path.basename(clip), type(e).__name__, e)
+                    play = None
+
+                expected = (golden or {}).get(os.path.basename(clip))
+                if expected is not None:
+                    matches = score_play(play, expected)
+                    for name, ok in matches.items():
+                        field_hits.setdefault(name, []).append(ok)
+                    exact_matches.append(all(matches.values()))
+    finally:
+        tracer.listeners.remove(spans.append)
+    elapsed = time.perf_counter() - start
+
+    stages: Dict[str, List[float]] = {}
+    for span in spans:
+        stages.setdefault(span.stage, []).append(span.wall_ms)
+
+    processed = len(clips) * repeat
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "clips": len(clips),
+        "repeat": repeat,
+        "failures": failures,
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "clips_per_second": processed / elapsed if elapsed else None,
+        "peak_rss_mb": peak_rss_bytes() / 2**20,
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "mean_ms": sum(values) / len(values),
+            }
+            for stage, values in stages.items()
+        },
+        "accuracy": {
+            "exact_match": sum(exact_matches) / len(exact_matches) if exact_matches else None,
+            "fields": {name: sum(hits) / len(hits) for name, hits in field_hits.items()},
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results: dict, results_dir: str = RESULTS_DIR) -> str:
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{results['timestamp'].replace(':', '-')}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def latest_results(results_dir: str = RESULTS_DIR) -> Optional[str]:
+    paths = sorted(glob.glob(os.path.join(results_dir, "*.json")))
+    return paths[-1] if paths else None
+
+
+def print_report(results: dict, baseline: Optional[dict] = None):
+    """Print the stage table, with the change against baseline when one is given."""
+
+    def delta(current, previous):
+        if previous is None or current is None or not previous:
+            return ""
+        return f" ({(current - previous) / previous:+.0%})"
+
+    base_stages = (baseline or {}).get("stages", {})
+    print(f"{'stage':<24} {'count':>6} {'p50 (ms)':>18} {'p95 (ms)':>18}")
+    for stage, stats in sorted(results["stages"].items()):
+        base = base_stages.get(stage, {})
+        p50 = f"{stats['p50_ms']:.1f}{delta(stats['p50_ms'], base.get('p50_ms'))}"
+        p95 = f"{stats['p95_ms']:.1f}{delta(stats['p95_ms'], base.get('p95_ms'))}"
+        print(f"{stage:<24} {stats['count']:>6} {p50:>18} {p95:>18}")
+
+    base = baseline or {}
+    print()
+    print(f"clips/sec:   {results['clips_per_second']:.3f}{delta(results['clips_per_second'], base.get('clips_per_second'))}")
+    print(f"peak RSS:    {results['peak_rss_mb']:.0f} MB{delta(results['peak_rss_mb'], base.get('peak_rss_mb'))}")
+    print(f"failures:    {results['failures']}")
+    for name, count in sorted(results.get("errors", {}).items()):
+        print(f"    {name:<18} {count}")
+    accuracy = results["accuracy"]
+    if accuracy["exact_match"] is not None:
+        print(f"exact match: {accuracy['exact_match']:.1%}")
+        for name, rate in sorted(accuracy["fields"].items()):
+            print(f"    {name:<18} {rate:.1%}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark transcribe -> normalize -> parse -> GameState.update over a clip corpus"
+    )
+    arg_parser.add_argument("--clips", default="s5/*.mp3", help="Glob of audio clips, replayed in sorted order")
+    arg_parser.add_argument("--golden", help="JSON file mapping clip file name to its expected Play JSON")
+    arg_parser.add_argument(
+        "--responses",
+        default="bench_responses.json",
+        help="Recorded LLM responses (transcript -> response text) replayed by the Ollama stub",
+    )
+    arg_parser.add_argument(
+        "--record",
+        action="store_true",
+        help=f"Forward unknown transcripts to the real Ollama at {config.OLLAMA_BASE_URL} and save its responses",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus")
+    arg_parser.add_argument("--results-dir", default=RESULTS_DIR)
+    arg_parser.add_argument("--compare", help="Earlier results file to compare against (default: latest)")
+    arg_parser.add_argument(
+        "--use-cache", action="store_true", help="Allow cached transcriptions (skips Whisper for known clips)"
+    )
+    args = arg_parser.parse_args()
+    if not args.use_cache:
+        config.TRANSCRIPTION_CACHE = ""
+
+    clips = sorted(glob.glob(args.clips))
+    if not clips:
+        raise SystemExit(f"No audio clips match {args.clips}")
+    golden = None
+    if args.golden:
+        with open(args.golden) as f:
+            golden = json.load(f)
+
+    stub = OllamaStub.from_file(args.responses, upstream=config.OLLAMA_BASE_URL if args.record else None)
+    config.OLLAMA_BASE_URL = stub.start()
+    try:
+        results = run_benchmark(clips, golden, args.repeat)
+    finally:
+        stub.stop()
+    results["llm_stub_misses"] = stub.misses
+    if args.record:
+        stub.save(args.responses)
+
+    baseline_path = args.compare or latest_results(args.results_dir)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"Compared against {baseline_path}\n")
+    path = save_results(results, args.results_dir)
+    print_report(results, baseline)
+    print(f"\nSaved {path}")
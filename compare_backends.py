@@ -0,0 +1,133 @@
+# compare_backends.py - Word error rate and latency comparison of speech backends
+import argparse
+import glob
+import json
+import re
+import time
+from typing import Dict, List, Optional
+
+from speech import get_backend
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase and strip punctuation so only word choice is compared."""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,  # deletion
+                    current[j - 1] + 1,  # insertion
+                    previous[j - 1] + (ref_word != hyp_word),  # substitution
+                )
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def parse_spec(spec: str) -> Dict[str, Optional[str]]:
+    """Split 'backend[:model[:compute_type]]', e.g. 'faster-whisper:small:int8'."""
+    parts = spec.split(":")
+    return {
+        "name": parts[0],
+        "model_size": parts[1] if len(parts) > 1 else None,
+        "compute_type": parts[2] if len(parts) > 2 else None,
+    }
+
+
+def run_backend(spec: str, clips: List[str]) -> dict:
+    """Load one backend and transcribe every clip, timing each step."""
+    start = time.perf_counter()
+    backend = get_backend(**parse_spec(spec))
+    load_seconds = time.perf_counter() - start
+
+    texts = {}
+    latencies = {}
+    for clip in clips:
+        start = time.perf_counter()
+        texts[clip] = backend.transcribe(clip).text
+        latencies[clip] = time.perf_counter() - start
+
+    return {
+        "spec": spec,
+        "load_seconds": load_seconds,
+        "texts": texts,
+        "latencies": latencies,
+    }
+
+
+def compare(specs: List[str], clips: List[str], references: Optional[Dict[str, str]] = None) -> List[dict]:
+    """
+    Run every backend over the clips and score it against the references.
+    Without references, the first backend's output is used as the reference.
+    """
+    runs = [run_backend(spec, clips) for spec in specs]
+    if references is None:
+        references = runs[0]["texts"]
+
+    for run in runs:
+        scored = [c for c in clips if c in references]
+        run["wer"] = (
+            sum(word_error_rate(references[c], run["texts"][c]) for c in scored)
+            / len(scored)
+            if scored
+            else None
+        )
+        run["mean_latency"] = sum(run["latencies"].values()) / len(clips)
+        run["total_seconds"] = sum(run["latencies"].values())
+    return runs
+
+
+def print_report(runs: List[dict]):
+    print(f"{'backend':<32} {'load (s)':>9} {'mean/clip (s)':>14} {'total (s)':>10} {'WER':>7}")
+    for run in runs:
+        wer = f"{run['wer']:.3f}" if run["wer"] is not None else "n/a"
+        print(
+            f"{run['spec']:<32} {run['load_seconds']:>9.2f} "
+            f"{run['mean_latency']:>14.2f} {run['total_seconds']:>10.2f} {wer:>7}"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Compare speech backends on word error rate and latency"
+    )
+    arg_parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["whisper:base", "faster-whisper:base:int8"],
+        help="Backend specs as backend[:model[:compute_type]]",
+    )
+    arg_parser.add_argument("--clips", default="s5/*.mp3", help="Glob of audio clips")
+    arg_parser.add_argument(
+        "--references",
+        help="JSON file mapping clip path to its reference transcript",
+    )
+    arg_parser.add_argument("--output", help="Write the full results to this JSON file")
+    args = arg_parser.parse_args()
+
+    clips = sorted(glob.glob(args.clips))
+    if not clips:
+        raise SystemExit(f"No audio clips match {args.clips}")
+    references = None
+    if args.references:
+        with open(args.references) as f:
+            references = json.load(f)
+
+    runs = compare(args.backends, clips, references)
+    print_report(runs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(runs, f, indent=2)
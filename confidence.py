@@ -0,0 +1,123 @@
+# confidence.py - Play confidence from speech, keyword and validation signals, with selective re-parsing
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import config
+from fix_hit_info import KeywordMatch, classify_transcript, extract_bases, fix_play_info
+from parse_play import format_context, parse_transcript
+from schema import Play
+from tracing import span
+
+# Relative weight of each signal; signals that are unavailable are left out
+WEIGHTS = {"speech": 0.3, "agreement": 0.45, "validation": 0.25}
+
+
+@dataclass
+class ConfidenceReport:
+    score: float
+    # Per-signal scores in 0-1, None when the signal wasn't available
+    speech: Optional[float] = None
+    agreement: Optional[float] = None
+    validation: Optional[float] = None
+    error: Optional[str] = None
+
+
+def speech_confidence(segments: List[dict]) -> Optional[float]:
+    """
+    Duration-weighted mean over segments of exp(avg_logprob) * (1 - no_speech_prob).
+    None when the backend doesn't report log-probs (whisper.cpp).
+    """
+    total = weight = 0.0
+    for s in segments:
+        if s.get("avg_logprob") is None:
+            continue
+        duration = max(s["end"] - s["start"], 0.01)
+        score = math.exp(min(s["avg_logprob"], 0.0)) * (1.0 - (s.get("no_speech_prob") or 0.0))
+        total += duration * score
+        weight += duration
+    return total / weight if weight else None
+
+
+def agreement_score(play: Play, match: KeywordMatch) -> Optional[float]:
+    """
+    How well the LLM output agrees with the keyword rules, before fix_play_info
+    overrides it. A disagreement with a confident keyword match scores low.
+    None when the transcript has no play type keyword.
+    """
+    if not match.play_type:
+        return None
+    if play.play_type == match.play_type:
+        score = 1.0
+    else:
+        score = 1.0 - match.confidence
+    if match.hit_type and play.hit_type and play.hit_type != match.hit_type:
+        score *= 0.8
+    return score
+
+
+def score_play(
+    play: Play,
+    game,
+    agreement: Optional[float] = None,
+    segments: Optional[List[dict]] = None,
+) -> ConfidenceReport:
+    """
+    Combine the signals into one weighted score. agreement comes from
+    agreement_score on the raw LLM output; play is validated as it will be applied.
+    """
+    valid, error = game.validate_play(play)
+    report = ConfidenceReport(
+        score=0.0,
+        speech=speech_confidence(segments) if segments else None,
+        agreement=agreement,
+        validation=1.0 if valid else 0.0,
+        error=None if valid else error,
+    )
+    available = {name: getattr(report, name) for name in WEIGHTS if getattr(report, name) is not None}
+    report.score = sum(WEIGHTS[name] * value for name, value in available.items()) / sum(
+        WEIGHTS[name] for name in available
+    )
+    return report
+
+
+def _parse_and_score(transcript: str, match: KeywordMatch, game, segments, **llm_options):
+    play = parse_transcript(transcript, format_context(game), **llm_options)
+    # Agreement is measured before fix_play_info overwrites the LLM's fields
+    agreement = agreement_score(play, match)
+    play = fix_play_info(play, transcript)
+    play = extract_bases(play, transcript)
+    return play, score_play(play, game, agreement, segments)
+
+
+def parse_with_confidence(
+    transcript: str,
+    game,
+    segments: Optional[List[dict]] = None,
+    threshold: Optional[float] = None,
+) -> Play:
+    """
+    Parse a transcript, patch it with fix_play_info/extract_bases and set
+    play.confidence. Plays below the threshold (config.CONFIDENCE_THRESHOLD) are
+    parsed again with config.REPARSE_MODEL (default: the current LLM_MODEL) at
+    config.REPARSE_TEMPERATURE, and the more confident of the two parses is kept.
+    """
+    threshold = config.CONFIDENCE_THRESHOLD if threshold is None else threshold
+    match = classify_transcript(transcript)
+
+    play, report = _parse_and_score(transcript, match, game, segments)
+    if report.score < threshold:
+        with span("reparse"):
+            retry, retry_report = _parse_and_score(
+                transcript,
+                match,
+                game,
+                segments,
+                model=config.REPARSE_MODEL or config.LLM_MODEL,
+                temperature=config.REPARSE_TEMPERATURE,
+            )
+        if retry_report.score > report.score:
+            play, report = retry, retry_report
+
+    play.confidence = round(report.score, 3)
+    return play
@@ -0,0 +1,77 @@
+# config.py - Runtime settings, overridable through environment variables
+import os
+
+# Speech recognition
+# Backend: "whisper" (openai-whisper), "faster-whisper" (CTranslate2) or "whisper-cpp"
+SPEECH_BACKEND = os.environ.get("SARG_SPEECH_BACKEND", "whisper")
+# Model size: tiny, base, small, medium, large (whisper.cpp also accepts e.g. "base.en")
+SPEECH_MODEL = os.environ.get("SARG_SPEECH_MODEL", "base")
+# Weight precision for faster-whisper: int8 is the fastest option on CPU
+SPEECH_COMPUTE_TYPE = os.environ.get("SARG_SPEECH_COMPUTE_TYPE", "int8")
+SPEECH_DEVICE = os.environ.get("SARG_SPEECH_DEVICE", "cpu")
+# CPU threads for transcription: torch intra-op threads (whisper), cpu_threads
+# (faster-whisper) or n_threads (whisper.cpp). 0 keeps the library default.
+SPEECH_THREADS = int(os.environ.get("SARG_SPEECH_THREADS", "0"))
+# torch inter-op threads (whisper only, 0 keeps the default)
+SPEECH_INTEROP_THREADS = int(os.environ.get("SARG_SPEECH_INTEROP_THREADS", "0"))
+# Cores the speech stage may run on, e.g. "0-5" or "0,2,4" (empty: all cores)
+SPEECH_CPUS = os.environ.get("SARG_SPEECH_CPUS", "")
+# Word-level timestamps on each segment (whisper and faster-whisper; "1" enables).
+# Off by default: the alignment pass adds to every clip's transcription time.
+SPEECH_WORD_TIMESTAMPS = os.environ.get("SARG_SPEECH_WORD_TIMESTAMPS", "0") == "1"
+# Transcriptions are cached here by audio content (empty string disables)
+TRANSCRIPTION_CACHE = os.environ.get("SARG_TRANSCRIPTION_CACHE", ".transcription_cache")
+TRANSCRIPTION_CACHE_MB = int(os.environ.get("SARG_TRANSCRIPTION_CACHE_MB", "200"))
+
+# LLM parsing
+# Engine: "ollama" (HTTP server), "llama-cpp" (in-process GGUF model via
+# llama-cpp-python) or "stub" (deterministic, no model; see llm_backend.py)
+LLM_BACKEND = os.environ.get("SARG_LLM_BACKEND", "ollama")
+OLLAMA_BASE_URL = os.environ.get("SARG_OLLAMA_BASE_URL", "http://localhost:11434")
+LLM_MODEL = os.environ.get("SARG_LLM_MODEL", "llama3.1")
+# Quantized GGUF model file for the llama-cpp backend, e.g. "models/llama-3.2-3b-instruct-q4_k_m.gguf"
+LLAMA_CPP_MODEL = os.environ.get("SARG_LLAMA_CPP_MODEL", "")
+# Context window for llama-cpp (the parse prompt with format instructions is ~2k tokens)
+LLAMA_CPP_N_CTX = int(os.environ.get("SARG_LLAMA_CPP_N_CTX", "4096"))
+# Most tokens llama-cpp generates per parse
+LLM_MAX_TOKENS = int(os.environ.get("SARG_LLM_MAX_TOKENS", "512"))
+# Recorded responses (transcript -> text, as written by benchmark.py --record) for the stub backend
+LLM_STUB_RESPONSES = os.environ.get("SARG_LLM_STUB_RESPONSES", "")
+# Generation threads: Ollama num_thread or llama-cpp n_threads (0 lets the engine decide)
+LLM_NUM_THREAD = int(os.environ.get("SARG_LLM_NUM_THREAD", "0"))
+# How long Ollama keeps the model loaded after each request, e.g. "30m"
+# (a negative duration such as "-1m" keeps it loaded indefinitely)
+LLM_KEEP_ALIVE = os.environ.get("SARG_LLM_KEEP_ALIVE", "30m")
+# Load and probe the model at startup (see llm_health.py); "0" skips it
+LLM_WARMUP = os.environ.get("SARG_LLM_WARMUP", "1") == "1"
+# Smaller model to parse with when the first-token latency of LLM_MODEL is over
+# LLM_FIRST_TOKEN_BUDGET seconds at startup (empty: never switch)
+LLM_FALLBACK_MODEL = os.environ.get("SARG_LLM_FALLBACK_MODEL", "")
+LLM_FIRST_TOKEN_BUDGET = float(os.environ.get("SARG_LLM_FIRST_TOKEN_BUDGET", "2.0"))
+# Plays scoring below this confidence (0-1) are parsed a second time
+CONFIDENCE_THRESHOLD = float(os.environ.get("SARG_CONFIDENCE_THRESHOLD", "0.6"))
+# Model and temperature of that second parse (e.g. a larger model such as "llama3.1:70b").
+# Empty means LLM_MODEL as it is at parse time (llm_health may switch it at startup).
+REPARSE_MODEL = os.environ.get("SARG_REPARSE_MODEL", "")
+REPARSE_TEMPERATURE = float(os.environ.get("SARG_REPARSE_TEMPERATURE", "0.4"))
+# Trained play classifier (play_classifier.py) that parses simple plays without
+# the LLM; ignored until the file exists, empty string disables
+PLAY_CLASSIFIER = os.environ.get("SARG_PLAY_CLASSIFIER", "play_classifier.npz")
+# Lowest classifier probability to accept a field without the LLM
+CLASSIFIER_THRESHOLD = float(os.environ.get("SARG_CLASSIFIER_THRESHOLD", "0.9"))
+# Transcribe clips incrementally every this many seconds of audio and preview
+# pitch calls before the announcement ends (0 disables). With clip files the
+# partial passes run back to back, so this adds latency (see speculative.py)
+SPECULATIVE_STEP_SECONDS = float(os.environ.get("SARG_SPECULATIVE_STEP_SECONDS", "0"))
+
+# Instrumentation
+# Log level: DEBUG also logs every traced stage with its latency
+LOG_LEVEL = os.environ.get("SARG_LOG_LEVEL", "INFO")
+# JSON lines log file, rotated at LOG_MAX_BYTES keeping LOG_BACKUPS old files (empty string disables)
+LOG_FILE = os.environ.get("SARG_LOG_FILE", "sarg.log")
+LOG_MAX_BYTES = int(os.environ.get("SARG_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.environ.get("SARG_LOG_BACKUPS", "5"))
+# Per-stage timings are appended here as JSON lines (empty string disables)
+TRACE_FILE = os.environ.get("SARG_TRACE_FILE", "trace.jsonl")
+# Port for the Prometheus-style /metrics endpoint (0 disables)
+METRICS_PORT = int(os.environ.get("SARG_METRICS_PORT", "0"))
@@ -0,0 +1,110 @@
+# context_eval.py - Parse accuracy and prompt size with and without game-state context
+import argparse
+import re
+import time
+from typing import Dict, List
+
+from gamestate import GameState
+from parse_play import format_context, parse_transcript
+from simulator import GameSimulator, load_corpus
+
+MODES = ("none", "verbose", "compact")
+
+
+def verbose_context(game) -> str:
+    """The free-text context main.py used to build (and never sent)."""
+    current_bases = game.bases.snapshot()
+    context_info = f"Current game state - Count: {game.balls}-{game.strikes}, Outs: {game.outs}"
+    if any(current_bases.values()):
+        runners_info = ", ".join(f"{base}: {player}" for base, player in current_bases.items() if player)
+        context_info += f", Runners: {runners_info}"
+    else:
+        context_info += ", Bases empty"
+    return context_info
+
+
+def build_context(mode: str, game) -> str:
+    if mode == "compact":
+        return format_context(game)
+    if mode == "verbose":
+        return verbose_context(game)
+    return "unknown"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count: words and punctuation marks."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def evaluate(items, modes=MODES) -> Dict[str, dict]:
+    """
+    Parse every simulated play once per context mode and compare the raw LLM
+    output with the simulator's ground truth:
+        - play_type: play type matches
+        - bases: applying the parse leaves the same runners on base as the true play
+        - valid: GameState.validate_play accepts the parse
+    Each half-inning is its own GameState session, fed the true plays so every
+    mode sees the same (correct) context.
+    """
+    stats = {
+        mode: {"plays": 0, "play_type": 0, "bases": 0, "valid": 0, "context_tokens": 0, "seconds": 0.0}
+        for mode in modes
+    }
+    game = None
+    current = None
+    for item in items:
+        if (item.game, item.inning, item.top) != current:
+            game = GameState(home_team="HOME", away_team="AWAY")
+            game.inning.number, game.inning.top = item.inning, item.top
+            current = (item.game, item.inning, item.top)
+
+        expected = game.copy()
+        expected.apply_unchecked(item.play.model_copy(deep=True))
+
+        for mode in modes:
+            context = build_context(mode, game)
+            start = time.perf_counter()
+            parsed = parse_transcript(item.transcript, context)
+            elapsed = time.perf_counter() - start
+
+            after = game.copy()
+            valid, _error = after.validate_play(parsed)
+            after.apply_unchecked(parsed)
+
+            s = stats[mode]
+            s["plays"] += 1
+            s["play_type"] += parsed.play_type == item.play.play_type
+            s["bases"] += after.bases.slots == expected.bases.slots
+            s["valid"] += valid
+            s["context_tokens"] += estimate_tokens(context)
+            s["seconds"] += elapsed
+
+        game.apply_unchecked(item.play)
+    return stats
+
+
+def print_report(stats: Dict[str, dict]):
+    print(f"{'context':<10} {'plays':>6} {'play_type':>10} {'bases':>7} {'valid':>7} {'~tokens':>8} {'s/play':>7}")
+    for mode, s in stats.items():
+        n = s["plays"] or 1
+        print(
+            f"{mode:<10} {s['plays']:>6} {s['play_type'] / n:>10.1%} {s['bases'] / n:>7.1%} "
+            f"{s['valid'] / n:>7.1%} {s['context_tokens'] / n:>8.1f} {s['seconds'] / n:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Compare parse accuracy and prompt size across game-state context formats (needs ollama serve)"
+    )
+    arg_parser.add_argument("--corpus", help="Corpus written by simulator.py --out (default: simulate)")
+    arg_parser.add_argument("--plays", type=int, default=100)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = arg_parser.parse_args()
+
+    if args.corpus:
+        items: List = list(load_corpus(args.corpus))[: args.plays]
+    else:
+        items = list(GameSimulator(args.seed).plays(args.plays))
+    print_report(evaluate(items, args.modes))
@@ -1,91 +1,237 @@
 # fix_play_info.py
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
 from schema import Play
+from tracing import traced
+
+# Keyword tables: (phrase in the lowercased transcript, value for the Play field).
+# Phrases match whole words only ("balls" is not "ball"), so inflected verbs are listed.
+PLAY_TYPE_KEYWORDS = [
+    ("double play", "double_play"),
+    ("triple play", "triple_play"),
+    ("hit by pitch", "hit_by_pitch"),
+    ("sac fly", "sac_fly"),
+    ("sac bunt", "sac_bunt"),
+    ("single", "single"),
+    ("singles", "single"),
+    ("singled", "single"),
+    ("double", "double"),
+    ("doubles", "double"),
+    ("doubled", "double"),
+    ("triple", "triple"),
+    ("triples", "triple"),
+    ("tripled", "triple"),
+    ("home run", "home_run"),
+    ("homer", "home_run"),
+    ("homers", "home_run"),
+    ("homered", "home_run"),
+    ("strikeout", "strikeout"),
+    ("strikes out", "strikeout"),
+    ("struck out", "strikeout"),
+    ("walk", "walk"),
+    ("walks", "walk"),
+    ("walked", "walk"),
+    ("error", "error"),
+    ("fielder choice", "fielder_choice"),
+    ("fielder's choice", "fielder_choice"),
+    ("ground out", "ground_out"),
+    ("grounds out", "ground_out"),
+    ("fly out", "fly_out"),
+    ("flies out", "fly_out"),
+    ("line out", "line_out"),
+    ("lines out", "line_out"),
+    ("pop out", "pop_out"),
+    ("pops out", "pop_out"),
+    ("ball", "ball"),
+    ("takes a ball", "ball"),
+    ("called strike", "called_strike"),
+    ("swinging strike", "swinging_strike"),
+    ("swings and misses", "swinging_strike"),
+    ("foul", "foul"),
+    ("foul ball", "foul"),
+    ("fouls it off", "foul"),
+    ("fouled off", "foul"),
+    ("stolen base", "stolen_base"),
+    ("steals", "stolen_base"),
+    ("stole", "stolen_base"),
+    ("caught stealing", "caught_stealing"),
+    ("pickoff", "pickoff"),
+    ("picked off", "pickoff"),
+    ("wild pitch", "wild_pitch"),
+    ("passed ball", "passed_ball"),
+    ("balk", "balk"),
+    ("substitution", "substitution"),
+    ("pitching change", "pitching_change"),
+    ("in play", "in_play"),
+    ("ball in play", "in_play"),
+]
+
+HIT_TYPE_KEYWORDS = [
+    ("ground ball", "ground_ball"),
+    ("grounder", "ground_ball"),
+    ("fly ball", "fly_ball"),
+    ("line drive", "line_drive"),
+    ("popup", "popup"),
+    ("pop up", "popup"),
+    ("bunt", "bunt"),
+]
+
+DIRECTION_KEYWORDS = [
+    ("shortstop", "ss"),
+    ("second base", "2b"),
+    ("third base", "3b"),
+    ("first base", "1b"),
+    ("left field", "lf"),
+    ("center field", "cf"),
+    ("centerfield", "cf"),
+    ("right field", "rf"),
+    ("pitcher", "p"),
+    ("catcher", "c"),
+]
+
+# Individual pitches rank below at-bat outcomes, so "takes a ball ... walks" is a walk
+PITCH_TYPES = {"ball", "called_strike", "swinging_strike", "foul"}
+
+# Announcements open with the batter's name: the leading capitalized words
+BATTER_PATTERN = re.compile(r"\s*((?:[A-Z][\w'.-]*\s+)+)(?=[a-z])")
+
+
+def batter_name(transcript: str, end: Optional[int] = None) -> Optional[str]:
+    """
+    The batter named at the start of an announcement ("Bo Bichette hits a foul
+    ball" -> "Bo Bichette"), or None. With end, the name must finish before that
+    offset, so a call opening the text ("Ball four") isn't taken for a name.
+    """
+    name = BATTER_PATTERN.match(transcript)
+    if name is None or (end is not None and name.end(1) > end):
+        return None
+    return name.group(1).strip()
+
+
+# Generic "in play" ranks below everything else: it only says the ball was hit
+VAGUE_TYPES = {"in_play"}
+
+
+def _tier(play_type: str) -> int:
+    """Rank of a play type: at-bat outcomes, then pitch calls, then vague types."""
+    if play_type in VAGUE_TYPES:
+        return 0
+    return 1 if play_type in PITCH_TYPES else 2
+
+
+def _build_matcher() -> Tuple["re.Pattern", Dict[str, Tuple[str, str, int]]]:
+    """
+    Compile every keyword from the three tables into one alternation.
+    Longest phrases come first, so at any position the most specific phrase wins
+    and its words are consumed ("ground ball" never also reports "ball").
+    """
+    keywords: Dict[str, Tuple[str, str, int]] = {}
+    for field_name, table in (
+        ("play_type", PLAY_TYPE_KEYWORDS),
+        ("hit_type", HIT_TYPE_KEYWORDS),
+        ("hit_direction", DIRECTION_KEYWORDS),
+    ):
+        for priority, (phrase, value) in enumerate(table):
+            keywords.setdefault(phrase, (field_name, value, priority))
+
+    alternation = "|".join(
+        re.escape(phrase) for phrase in sorted(keywords, key=len, reverse=True)
+    )
+    return re.compile(rf"\b(?:{alternation})(?!\w)"), keywords
+
+
+_MATCHER, _KEYWORDS = _build_matcher()
 
 
-def fix_play_info(play: Play, transcript: str) -> Play:
+@dataclass
+class KeywordHit:
+    phrase: str
+    field_name: str
+    value: str
+    start: int
+
+
+@dataclass
+class KeywordMatch:
+    """Result of scanning a transcript for play, hit type and direction keywords."""
+
+    play_type: Optional[str] = None
+    hit_type: Optional[str] = None
+    hit_direction: Optional[str] = None
+    # Share of the play-type evidence behind the chosen play_type (0.0 if none found)
+    confidence: float = 0.0
+    hits: List[KeywordHit] = field(default_factory=list)
+
+
+def classify_transcript(transcript: str) -> KeywordMatch:
+    """
+    Find every keyword in one pass over the transcript and resolve each field.
+        - play_type: at-bat outcomes over pitches over "in play", then the
+          longest phrase, then the earlier entry in PLAY_TYPE_KEYWORDS
+        - hit_type: the longest phrase, then the first mentioned
+        - hit_direction: the first fielder or field mentioned
+    """
+    hits = [
+        KeywordHit(m.group(0), *_KEYWORDS[m.group(0)][:2], m.start())
+        for m in _MATCHER.finditer(transcript.lower())
+    ]
+    match = KeywordMatch(hits=hits)
+
+    play_hits = [h for h in hits if h.field_name == "play_type"]
+    if play_hits:
+        def rank(hit: KeywordHit):
+            return (
+                _tier(hit.value),
+                len(hit.phrase),
+                -_KEYWORDS[hit.phrase][2],
+            )
+
+        best = max(play_hits, key=rank)
+        match.play_type = best.value
+
+        # Evidence per distinct play type is its longest phrase. Lower-ranked
+        # calls that lead up to an outcome ("ball four, walks") count half, so
+        # any conflicting play type keeps the confidence below 1.0.
+        evidence: Dict[str, float] = {}
+        for hit in play_hits:
+            weight = len(hit.phrase) * (1.0 if _tier(hit.value) == _tier(best.value) else 0.5)
+            evidence[hit.value] = max(evidence.get(hit.value, 0.0), weight)
+        match.confidence = evidence[best.value] / sum(evidence.values())
+
+    hit_type_hits = [h for h in hits if h.field_name == "hit_type"]
+    if hit_type_hits:
+        match.hit_type = max(hit_type_hits, key=lambda h: (len(h.phrase), -h.start)).value
+
+    direction_hits = [h for h in hits if h.field_name == "hit_direction"]
+    if direction_hits:
+        match.hit_direction = direction_hits[0].value
+
+    return match
+
+
+@traced("fix_play_info")
+def fix_play_info(play: Play, transcript: str, min_confidence: float = 0.0) -> Play:
     """
     Updates a Play object with:
-        - play_type (prioritized for multi-word events)
+        - play_type (only when the keyword confidence is at least min_confidence)
         - hit_type
         - hit_direction
         - clears runners if 'Bases empty' is in transcript
     """
-    transcript_lower = transcript.lower()
-
-    # --------- 1. Play type prioritization ----------
-    # Longer/multi-word events first
-    play_type_map = [
-        ("double play", "double_play"),
-        ("triple play", "triple_play"),
-        ("hit by pitch", "hit_by_pitch"),
-        ("sac fly", "sac_fly"),
-        ("sac bunt", "sac_bunt"),
-        ("single", "single"),
-        ("double", "double"),
-        ("triple", "triple"),
-        ("home run", "home_run"),
-        ("strikeout", "strikeout"),
-        ("walk", "walk"),
-        ("error", "error"),
-        ("fielder choice", "fielder_choice"),
-        ("ground out", "ground_out"),
-        ("fly out", "fly_out"),
-        ("line out", "line_out"),
-        ("pop out", "pop_out"),
-        ("ball", "ball"),
-        ("called strike", "called_strike"),
-        ("swinging strike", "swinging_strike"),
-        ("foul", "foul"),
-        ("stolen base", "stolen_base"),
-        ("caught stealing", "caught_stealing"),
-        ("pickoff", "pickoff"),
-        ("wild pitch", "wild_pitch"),
-        ("passed ball", "passed_ball"),
-        ("balk", "balk"),
-        ("substitution", "substitution"),
-        ("pitching change", "pitching_change"),
-        ("in play", "in_play"),
-    ]
+    match = classify_transcript(transcript)
 
-    for keyword, pt in play_type_map:
-        if keyword in transcript_lower:
-            play.play_type = pt
-            break  
+    if match.play_type and match.confidence >= min_confidence:
+        play.play_type = match.play_type
 
     # update hit type if detected
-    if "ground ball" in transcript_lower:
-        play.hit_type = "ground_ball"
-    elif "fly ball" in transcript_lower:
-        play.hit_type = "fly_ball"
-    elif "line drive" in transcript_lower:
-        play.hit_type = "line_drive"
-    elif "popup" in transcript_lower or "pop up" in transcript_lower:
-        play.hit_type = "popup"
-    elif "bunt" in transcript_lower:
-        play.hit_type = "bunt"
-    else:
-        play.hit_type = play.hit_type or None
+    play.hit_type = match.hit_type or play.hit_type or None
 
     # Update hit direction if detected
-    direction_map = {
-        "shortstop": "ss",
-        "second base": "2b",
-        "third base": "3b",
-        "first base": "1b",
-        "left field": "lf",
-        "center field": "cf",
-        "right field": "rf",
-        "pitcher": "p",
-        "catcher": "c",
-    }
-    play.hit_direction = None
-    for word, abbr in direction_map.items():
-        if word in transcript_lower:
-            play.hit_direction = abbr
-            break
-
-   
-    if "empty" in transcript_lower:
+    play.hit_direction = match.hit_direction
+
+    if "empty" in transcript.lower():
         play.runners = []
         play.batter = None
 
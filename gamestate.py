@@ -1,8 +1,73 @@
 # gamestate.py - Core baseball game state management
-from typing import Optional, List, Dict, Tuple
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Callable, Optional, List, Dict, Mapping, Tuple
 import json
 import copy
+import logging
+from base_out import (
+    BASE_INDEX,
+    BASE_NAMES,
+    TRANSITIONS,
+    apply_moves,
+    default_runner_movements,
+    encode_state,
+    mask_of,
+)
 from schema import Play, RunnerMovement
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Validation rules, shared by GameState.validate_play and bulk validation
+MAX_OUTS = 3
+VALID_START_BASES = ("none", "first", "second", "third", "home")
+VALID_END_BASES = ("out", "none", "first", "second", "third", "home")
+# Play types that must record an exact number of outs
+REQUIRED_OUTS = {"double_play": 2, "triple_play": 3}
+
+# Stand-in name when a default movement places a batter the parser didn't name
+UNKNOWN_RUNNER = "Unknown"
+
+# How many formatted recent plays each snapshot carries (for the GUI history)
+RECENT_PLAYS = 3
+
+
+def validate_play_fields(play: Play) -> Tuple[bool, str]:
+    """
+    Checks that don't depend on game state (outs range, runs, runner bases).
+    Returns: (is_valid, error_message) tuple
+    """
+    if not getattr(play, "play_type", None):
+        return False, "Play type is required"
+
+    if (
+        not isinstance(play.outs_made, int)
+        or play.outs_made < 0
+        or play.outs_made > MAX_OUTS
+    ):
+        return False, f"Invalid outs_made: {play.outs_made} (must be 0-3)"
+
+    if not isinstance(play.runs_scored, int) or play.runs_scored < 0:
+        return False, f"Invalid runs_scored: {play.runs_scored} (must be >= 0)"
+
+    # Validate special play types
+    required = REQUIRED_OUTS.get(play.play_type)
+    if required is not None and play.outs_made != required:
+        name = play.play_type.replace("_", " ").capitalize()
+        return False, f"{name} must have outs_made={required}, got {play.outs_made}"
+
+    # Validate runner movements
+    for move in play.runners:
+        start = move.start_base or "none"
+        end = move.end_base or "none"
+
+        if start not in VALID_START_BASES:
+            return False, f"Invalid start_base: {start}"
+        if end not in VALID_END_BASES:
+            return False, f"Invalid end_base: {end}"
+
+    return True, "Play is valid"
 
 
 class BatterState:
@@ -40,42 +105,64 @@ class BatterState:
 class Bases:
     """
     Bases state management for a baseball game, included in GameState.
+    Runner names live in a slot array (first, second, third) next to an
+    occupancy bitmask (bit 0 = first) used by the transition tables in base_out.
     """
 
     def __init__(self):
-        self.state: Dict[str, Optional[str]] = {
-            "first": None,
-            "second": None,
-            "third": None,
-        }
+        self.slots: List[Optional[str]] = [None, None, None]
+        self.mask: int = 0
+
+    @property
+    def state(self) -> Mapping[str, Optional[str]]:
+        """Read-only base name -> runner name view of the slots (assign state or use set_slots to change it)"""
+        return MappingProxyType(dict(zip(BASE_NAMES, self.slots)))
+
+    @state.setter
+    def state(self, value: Dict[str, Optional[str]]):
+        self.set_slots([value.get(base) for base in BASE_NAMES])
+
+    def set_slots(self, slots: List[Optional[str]]):
+        """Replace all three bases at once"""
+        self.slots = list(slots)
+        self.mask = mask_of(self.slots)
 
     def clear(self):
         """Clear all bases"""
-        self.state = {"first": None, "second": None, "third": None}
+        self.slots = [None, None, None]
+        self.mask = 0
 
     def clear_base(self, base: str):
         """Remove runner from specific base"""
-        if base in self.state:
-            self.state[base] = None
+        index = BASE_INDEX.get(base)
+        if index is not None:
+            self.slots[index] = None
+            self.mask &= ~(1 << index)
 
     def get_runner(self, base: str) -> Optional[str]:
         """Get runner name at base, or None"""
-        return self.state.get(base)
+        index = BASE_INDEX.get(base)
+        return self.slots[index] if index is not None else None
 
     def move_runner(self, start: str, end: str, player: Optional[str]):
         """Move runner from start to end base"""
-        if start in self.state and start != "none":
-            self.state[start] = None
+        self.clear_base(start)
+
+        index = BASE_INDEX.get(end)
+        if index is not None and player is not None:
+            self.slots[index] = player
+            self.mask |= 1 << index
 
-        if end in ["first", "second", "third"] and player is not None:
-            self.state[end] = player
+    def apply_moves(self, moves, batter: Optional[str]):
+        """Apply a base_out transition's moves to the slots"""
+        self.set_slots(apply_moves(self.slots, moves, batter))
 
     def snapshot(self) -> Dict[str, Optional[str]]:
         """Return copy of current base state"""
-        return dict(self.state)
+        return dict(zip(BASE_NAMES, self.slots))
 
     def __str__(self):
-        return f"Bases: {self.state}"
+        return f"Bases: {self.snapshot()}"
 
 
 class Inning:
@@ -121,6 +208,40 @@ class Team:
         return f"{self.name}: {self.runs}"
 
 
+@dataclass(frozen=True)
+class GameSnapshot:
+    """
+    Immutable, versioned copy of the game state. GameState publishes a new one
+    after every change; readers on any thread use the latest one without locks.
+    """
+
+    version: int
+    home_team: str
+    away_team: str
+    home_runs: int
+    away_runs: int
+    inning: int
+    top: bool
+    outs: int
+    balls: int
+    strikes: int
+    bases: Tuple[Optional[str], Optional[str], Optional[str]]
+    away_score: int
+    home_score: int
+    plays: int
+    recent_plays: Tuple[str, ...]
+
+    def runner(self, base: str) -> Optional[str]:
+        return self.bases[BASE_INDEX[base]]
+
+    def base_out_state(self) -> int:
+        return encode_state(mask_of(self.bases), min(self.outs, MAX_OUTS))
+
+    def as_dict(self) -> dict:
+        """JSON-compatible dict, e.g. for pushing to subscribers over a socket"""
+        return asdict(self)
+
+
 class GameState:
     """
     Manages the overall state of a baseball game with underlying logic.
@@ -140,6 +261,53 @@ class GameState:
         self.home_score: int = 0
         self.away_score: int = 0
 
+        # Latest published GameSnapshot and the callbacks told about each new one
+        self.subscribers: List[Callable[[GameSnapshot], None]] = []
+        self.published: GameSnapshot = self._make_snapshot(0)
+
+    def _make_snapshot(self, version: int) -> GameSnapshot:
+        return GameSnapshot(
+            version=version,
+            home_team=self.home.name,
+            away_team=self.away.name,
+            home_runs=self.home.runs,
+            away_runs=self.away.runs,
+            inning=self.inning.number,
+            top=self.inning.top,
+            outs=self.outs,
+            balls=self.balls,
+            strikes=self.strikes,
+            bases=tuple(self.bases.slots),
+            away_score=self.away_score,
+            home_score=self.home_score,
+            plays=len(self.history),
+            recent_plays=tuple(self.get_last_n_plays(RECENT_PLAYS)),
+        )
+
+    def publish(self) -> GameSnapshot:
+        """
+        Publish the current state as a new snapshot. The reference swap is a
+        single attribute assignment, so readers see either the old or the new
+        snapshot, never a partial one.
+        """
+        snapshot = self._make_snapshot(self.published.version + 1)
+        self.published = snapshot
+        for callback in list(self.subscribers):
+            callback(snapshot)
+        return snapshot
+
+    def subscribe(self, callback: Callable[[GameSnapshot], None]):
+        """Call callback with every new snapshot (on the thread that changed the game)."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[GameSnapshot], None]):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def base_out_state(self) -> int:
+        """Bases and outs packed as outs * 8 + occupancy mask (0-23 while the inning is live)"""
+        return encode_state(self.bases.mask, min(self.outs, 3))
+
     def batting_team(self) -> Team:
         """Return team currently at bat"""
         return self.away if self.inning.top else self.home
@@ -162,6 +330,11 @@ class GameState:
         Record a pitch and check for walk/strikeout.
         Returns: (event_type, should_continue) tuple
         """
+        result = self._record_pitch(pitch_result, batter_name)
+        self.publish()
+        return result
+
+    def _record_pitch(self, pitch_result: str, batter_name: Optional[str]):
         if pitch_result == "ball":
             self.balls += 1
             if self.balls >= 4:
@@ -179,32 +352,11 @@ class GameState:
 
     def _handle_walk(self, batter_name: Optional[str]):
         """Process walk - advance forced runners"""
-        first_runner = self.bases.get_runner("first")
-        second_runner = self.bases.get_runner("second")
-        third_runner = self.bases.get_runner("third")
-
-        if first_runner is None:
-            # First base empty - just put batter there
-            self.bases.move_runner("none", "first", batter_name)
-        else:
-            # First occupied - need to advance runners
-            if third_runner and second_runner and first_runner:
-                # Bases loaded - runner scores
-                self.add_runs(1)
-                self.bases.move_runner("third", "home", third_runner)
-                self.bases.move_runner("second", "third", second_runner)
-                self.bases.move_runner("first", "second", first_runner)
-                self.bases.move_runner("none", "first", batter_name)
-            elif second_runner and first_runner:
-                # First and second occupied
-                self.bases.move_runner("second", "third", second_runner)
-                self.bases.move_runner("first", "second", first_runner)
-                self.bases.move_runner("none", "first", batter_name)
-            else:
-                # Only first occupied
-                self.bases.move_runner("first", "second", first_runner)
-                self.bases.move_runner("none", "first", batter_name)
-
+        _mask, runs, moves = TRANSITIONS["walk"][self.bases.mask]
+        if runs:
+            # Bases loaded - runner scores
+            self.add_runs(runs)
+        self.bases.apply_moves(moves, batter_name)
         self.reset_count()
 
     def _handle_strikeout(self, batter_name: Optional[str]):
@@ -219,7 +371,10 @@ class GameState:
             self.change_sides()
 
     def change_sides(self):
-        """End half-inning: reset outs/bases/count, advance inning"""
+        """
+        End half-inning: reset outs/bases/count, advance inning.
+        Doesn't publish; record_pitch, update and undo_last_play do that once per change.
+        """
         self.outs = 0
         self.bases.clear()
         self.reset_count()
@@ -230,59 +385,38 @@ class GameState:
         Validate play data before applying to game state.
         Returns: (is_valid, error_message) tuple
         """
-        if not getattr(play, "play_type", None):
-            return False, "Play type is required"
-
-        if (
-            not isinstance(play.outs_made, int)
-            or play.outs_made < 0
-            or play.outs_made > 3
-        ):
-            return False, f"Invalid outs_made: {play.outs_made} (must be 0-3)"
-
-        if not isinstance(play.runs_scored, int) or play.runs_scored < 0:
-            return False, f"Invalid runs_scored: {play.runs_scored} (must be >= 0)"
+        valid, error = validate_play_fields(play)
+        if not valid:
+            return False, error
 
-        if self.outs + play.outs_made > 3:
+        if self.outs + play.outs_made > MAX_OUTS:
             return (
                 False,
                 f"Too many outs: current={self.outs}, play adds={play.outs_made}",
             )
 
-        # Validate special play types
-        if play.play_type == "double_play" and play.outs_made != 2:
-            return False, f"Double play must have outs_made=2, got {play.outs_made}"
-
-        if play.play_type == "triple_play" and play.outs_made != 3:
-            return False, f"Triple play must have outs_made=3, got {play.outs_made}"
-
-        # Validate runner movements
-        for move in play.runners:
-            start = move.start_base or "none"
-            end = move.end_base or "none"
-
-            if start not in ["none", "first", "second", "third", "home"]:
-                return False, f"Invalid start_base: {start}"
-            if end not in ["out", "none", "first", "second", "third", "home"]:
-                return False, f"Invalid end_base: {end}"
-
         return True, "Play is valid"
 
     def preview_play(self, play: Play) -> str:
         """Generate preview string of what play will do (doesn't modify state)"""
-        valid, error = self.validate_play(play)
+        # Read one published snapshot so the preview is consistent during an update
+        snap = self.published
+        valid, error = validate_play_fields(play)
+        if valid and snap.outs + play.outs_made > MAX_OUTS:
+            valid, error = False, f"Too many outs: current={snap.outs}, play adds={play.outs_made}"
         if not valid:
             return f"INVALID PLAY: {error}"
 
+        runs = snap.away_runs if snap.top else snap.home_runs
         preview = []
         preview.append("Play Preview:")
         preview.append(f"  Type: {play.play_type}")
-        preview.append(f"  Count: {self.balls}-{self.strikes}")
-        preview.append(f"  Outs: {self.outs} → {self.outs + play.outs_made}")
+        preview.append(f"  Count: {snap.balls}-{snap.strikes}")
+        preview.append(f"  Outs: {snap.outs} → {snap.outs + play.outs_made}")
         preview.append(
-            f"  Runs (batting team): {self.batting_team().runs} → {self.batting_team().runs + play.runs_scored}"
+            f"  Runs (batting team): {runs} → {runs + play.runs_scored}"
         )
-        preview.append(f"  Current bases: {self.bases.snapshot()}")
+        preview.append(f"  Current bases: {dict(zip(BASE_NAMES, snap.bases))}")
 
         if play.runners:
             preview.append("  Runner movements:")
@@ -340,6 +474,7 @@ class GameState:
             # Move the batter
             self.bases.move_runner("none", target_base, play.batter)
 
+    @traced("gamestate_update")
     def update(self, play: Play, validate: bool = True):
         """
         Apply a play to the game state.
@@ -354,43 +489,126 @@ class GameState:
             if not valid:
                 raise ValueError(f"Invalid play: {error}")
 
+        self.apply_unchecked(play)
+        self.publish()
+
+    @traced("gamestate_update")
+    def apply_plays(self, plays: List[Play], validate: bool = True):
+        """
+        Apply the plays from one announcement as a unit: either all of them are
+        applied and published once, or the first invalid play raises ValueError
+        and the game is left as it was. Returns the runs the plays scored.
+        """
+        saved = self._save()
+        runs = 0
+        try:
+            for play in plays:
+                if validate:
+                    valid, error = self.validate_play(play)
+                    if not valid:
+                        raise ValueError(f"Invalid play: {error}")
+                runs += self.apply_unchecked(play)
+        except Exception:
+            self._restore(saved)
+            raise
+        self.publish()
+        return runs
+
+    def _save(self) -> tuple:
+        """The fields plays change, to roll back to with _restore (much cheaper than copy())."""
+        return (
+            list(self.bases.slots),
+            self.outs,
+            self.balls,
+            self.strikes,
+            self.inning.number,
+            self.inning.top,
+            self.home.runs,
+            self.away.runs,
+            self.home_score,
+            self.away_score,
+            len(self.history),
+        )
+
+    def _restore(self, saved: tuple):
+        (
+            slots,
+            self.outs,
+            self.balls,
+            self.strikes,
+            number,
+            top,
+            home_runs,
+            away_runs,
+            self.home_score,
+            self.away_score,
+            plays,
+        ) = saved
+        self.bases.set_slots(slots)
+        self.inning.number, self.inning.top = number, top
+        self.home.runs, self.away.runs = home_runs, away_runs
+        del self.history[plays:]
+
+    def copy(self) -> "GameState":
+        """A detached copy of the current state (no history or subscribers) to try plays on."""
+        history, subscribers = self.history, self.subscribers
+        self.history, self.subscribers = [], []
+        try:
+            return copy.deepcopy(self)
+        finally:
+            self.history, self.subscribers = history, subscribers
+
+    def apply_unchecked(self, play: Play) -> int:
+        """
+        Apply a play without validating, tracing or publishing a snapshot, for
+        replays, undo and scratch copies (see copy()) that try plays out. Use
+        update() or apply_plays() for the live game. The play is stored in
+        history as given and isn't modified. Returns the runs it scored,
+        including those of runner movements derived for it.
+        """
         self.history.append(play)
  
         if play.play_type == "home_run":
             self._apply_home_run(play)
-            return
-        
-        if play.runners:
+            return play.runs_scored
+
+        runners, runs_scored = play.runners, play.runs_scored
+        if not runners:
+            # The LLM left out runner movements: derive the default ones for
+            # walks, hits and force plays from the base-out transition tables.
+            # They stay local, so history keeps the play as it was parsed.
+            derived = default_runner_movements(
+                play.play_type, self.bases.slots, play.batter or UNKNOWN_RUNNER
+            )
+            if derived is not None:
+                runners, runs = derived
+                if runs_scored == 0:
+                    runs_scored = runs
+
+        if runners:
             #Apply movements if LLM filled runners. 
-            current_base_state = self.bases.snapshot() 
-            moved_players = {r.player for r in play.runners if r.player}
-            final_bases = {}
+            current_slots = self.bases.slots
+            moved_players = {r.player for r in runners if r.player}
+            final_slots: List[Optional[str]] = [None, None, None]
+            taken = [False, False, False]
 
             # 2. Apply runner Movements 
-            for movement in play.runners:
-                player = movement.player
-                end = movement.end_base or "none"
-
-                if end in ["first", "second", "third"]:
+            for movement in runners:
+                index = BASE_INDEX.get(movement.end_base or "none")
+                if index is not None:
                     # Place the moving runner on their new, final base.
-                    final_bases[end] = player
-            
-            # 3. Carry over previous batters.
-            for base, player in current_base_state.items():
-                
-                if player is not None and player not in moved_players:
-                    
-                    if base not in final_bases: 
-                        # They stay on their original base, but ONLY if that base 
-                        # wasn't taken by another movement
-                        final_bases[base] = player
+                    final_slots[index] = movement.player
+                    taken[index] = True
 
-            self.bases.clear()
-            for base, player in final_bases.items():
-                if base in self.bases.state:
-                    # Populate new bases with the final state of all players.
-                    self.bases.state[base] = player
+            # 3. Carry over previous batters.
+            for index, player in enumerate(current_slots):
+                if player is not None and player not in moved_players and not taken[index]:
+                    # They stay on their original base, but ONLY if that base 
+                    # wasn't taken by another movement
+                    final_slots[index] = player
 
+            # Populate new bases with the final state of all players.
+            self.bases.set_slots(final_slots)
 
         if play.outs_after_play is not None:
             # If the LLM provides the total number of outs after the play (eg 2 outs, set that equal to the current outs)
@@ -402,8 +620,8 @@ class GameState:
 
 
         # Add runs scored from the play to the team score
-        if play.runs_scored > 0:
-            self.add_runs(play.runs_scored)
+        if runs_scored > 0:
+            self.add_runs(runs_scored)
 
         if (
             play.away_score_snapshot is not None
@@ -421,6 +639,8 @@ class GameState:
             # If the total outs reaches 3, execute the change of sides logic.
             self.bases.clear()
             # Goal here is to run this system half inning by half inning.
+        return runs_scored
+
     def undo_last_play(self) -> bool:
         """
         Undo the last play by replaying entire history without it.
@@ -433,14 +653,19 @@ class GameState:
         home_name = self.home.name
         away_name = self.away.name
         history_to_replay = list(self.history)
+        subscribers = self.subscribers
+        published = self.published
 
-        # Reset game state
+        # Reset game state (subscribers and the snapshot version carry over)
         self.__init__(home_team=home_name, away_team=away_name)
+        self.subscribers = subscribers
+        self.published = published
         # Replay all plays except the removed one
         for p in history_to_replay:
-            self.update(p, validate=False)
+            self.apply_unchecked(p)
+        self.publish()
 
-        print(f"UNDO: removed play {removed.play_type}")
+        logger.info("UNDO: removed play %s", removed.play_type)
         return True
 
     def get_last_n_plays(self, n: int = 3) -> List[str]:
@@ -491,8 +716,8 @@ class GameState:
             return f"{hit_type_str} {direction_str}"
         return hit_type_str
 
-    def to_json(self, path: str = "gamestate.json"):
-        """Save game state to JSON file"""
+    def state_dict(self, include_history: bool = True) -> dict:
+        """Serialize game state to a JSON-compatible dict"""
         obj = {
             "home": self.home.to_dict(),
             "away": self.away.to_dict(),
@@ -501,8 +726,16 @@ class GameState:
             "balls": self.balls,
             "strikes": self.strikes,
             "bases": self.bases.snapshot(),
-            "history": [p.dict() for p in self.history],
+            "away_score": self.away_score,
+            "home_score": self.home_score,
         }
+        if include_history:
+            obj["history"] = [p.dict() for p in self.history]
+        return obj
+
+    def to_json(self, path: str = "gamestate.json"):
+        """Save game state to JSON file"""
+        obj = self.state_dict()
         with open(path, "w") as f:
             json.dump(obj, f, indent=2)
 
@@ -521,6 +754,8 @@ class GameState:
         game.balls = data.get("balls", 0)
         game.strikes = data.get("strikes", 0)
         game.bases.state = data["bases"]
+        game.away_score = data.get("away_score", 0)
+        game.home_score = data.get("home_score", 0)
 
         # Restore play history
         for pd in data.get("history", []):
@@ -529,6 +764,7 @@ class GameState:
                 game.history.append(p)
             except Exception:
                 pass  # Skip invalid plays
+        game.publish()
         return game
 
     def get_away_score(self) -> int:
@@ -0,0 +1,70 @@
+# import_profile.py - Import-time profile of the project's modules
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+MODULES = ["gamestate", "schema", "fix_hit_info", "speech", "parse_play", "userinterf"]
+
+# Lines look like "import time:       412 |       1203 |   pydantic.main"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    Returns (name, self_us, cumulative_us, depth) for every module it pulled in.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def report(module: str, top: int = 10):
+    """Print the total import time of a module and its heaviest dependencies."""
+    try:
+        entries = profile_import(module)
+    except RuntimeError as e:
+        print(f"{module}: {e}\n")
+        return
+
+    # importtime lists children before their parent, so the module's direct
+    # dependencies are the depth-1 lines right above its own depth-0 line
+    index = next(i for i, e in enumerate(entries) if e[0] == module and e[3] == 0)
+    dependencies = []
+    for entry in reversed(entries[:index]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            dependencies.append(entry)
+
+    print(f"{module}: {entries[index][2] / 1000:.1f} ms")
+    shown = sorted(dependencies, key=lambda e: e[2], reverse=True)[:top]
+    for name, _self_us, cumulative_us, _depth in shown:
+        print(f"    {cumulative_us / 1000:>9.1f} ms  {name}")
+    print()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Report how long each project module takes to import"
+    )
+    arg_parser.add_argument("modules", nargs="*", default=MODULES)
+    arg_parser.add_argument("--top", type=int, default=10, help="Dependencies listed per module")
+    args = arg_parser.parse_args()
+
+    for module in args.modules:
+        report(module, args.top)
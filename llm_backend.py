@@ -0,0 +1,191 @@
+# llm_backend.py - Interchangeable LLM engines for the transcript parser
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+import config
+from tracing import span
+
+
+class LLMBackend:
+    """
+    Base class for text-completion engines used by parse_play.
+    Subclasses load their model in load() and return the completion of a prompt in complete().
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, temperature: float = 0.0):
+        self.model = model
+        self.temperature = temperature
+
+    def load(self):
+        pass
+
+    def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def runnable(self):
+        """The backend as a langchain Runnable, to use between a prompt and an output parser."""
+        from langchain_core.runnables import RunnableLambda
+
+        # PromptTemplate hands over a PromptValue, not a str
+        return RunnableLambda(
+            lambda value: self.complete(value.to_string() if hasattr(value, "to_string") else str(value))
+        )
+
+
+class OllamaBackend(LLMBackend):
+    """Model served by a local Ollama server over HTTP."""
+
+    name = "ollama"
+
+    def load(self):
+        from langchain_ollama.llms import OllamaLLM
+
+        #Best parameter combination found as of now.
+        self.llm = OllamaLLM(
+            model=self.model,
+            base_url=config.OLLAMA_BASE_URL,
+            temperature=self.temperature,
+            top_p=1,
+            repeat_penalty=1,
+            mirostat=0,
+            num_thread=config.LLM_NUM_THREAD or None,
+            # Keep the model loaded between plays (see llm_health.py)
+            keep_alive=config.LLM_KEEP_ALIVE,
+        )
+
+    def complete(self, prompt: str) -> str:
+        return self.llm.invoke(prompt)
+
+
+# GGUF models loaded by llama-cpp-python, keyed by path (shared across temperatures)
+_gguf_models: Dict[str, object] = {}
+
+
+class LlamaCppBackend(LLMBackend):
+    """
+    In-process llama.cpp engine (llama-cpp-python) running a quantized GGUF
+    model, e.g. a Q4_K_M Llama 3.2. No server and no HTTP round trip.
+    """
+
+    name = "llama-cpp"
+
+    def load(self):
+        from llama_cpp import Llama
+
+        # Ollama model names don't apply here: anything but a .gguf path means LLAMA_CPP_MODEL
+        path = self.model if self.model.endswith(".gguf") else config.LLAMA_CPP_MODEL
+        if not path:
+            raise ValueError("Set SARG_LLAMA_CPP_MODEL to a .gguf file to use the llama-cpp backend")
+        if path not in _gguf_models:
+            _gguf_models[path] = Llama(
+                model_path=path,
+                n_ctx=config.LLAMA_CPP_N_CTX,
+                n_threads=config.LLM_NUM_THREAD or None,
+                verbose=False,
+            )
+        self.llm = _gguf_models[path]
+
+    def complete(self, prompt: str) -> str:
+        result = self.llm(
+            prompt,
+            max_tokens=config.LLM_MAX_TOKENS,
+            temperature=self.temperature,
+            top_p=1,
+            repeat_penalty=1,
+        )
+        return result["choices"][0]["text"]
+
+
+# Outs before the play, as format_context() writes them into the prompt
+CONTEXT_OUTS_PATTERN = re.compile(r"\bouts=(\d)")
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic stand-in for a model, for tests and benchmarks without one.
+    Parse prompts get the responses recorded for their transcript (see
+    ollama_stub.py and config.LLM_STUB_RESPONSES), or else a Play built from
+    the keyword rules in fix_hit_info. Other prompts get an empty completion.
+    """
+
+    name = "stub"
+
+    def load(self):
+        self.responses: Dict[str, str] = {}
+        if config.LLM_STUB_RESPONSES:
+            try:
+                with open(config.LLM_STUB_RESPONSES) as f:
+                    self.responses = json.load(f)
+            except FileNotFoundError:
+                pass
+
+    def complete(self, prompt: str) -> str:
+        from ollama_stub import TRANSCRIPT_PATTERN
+
+        match = TRANSCRIPT_PATTERN.search(prompt)
+        if not match:
+            return ""
+        transcript = match.group(1).strip()
+        if transcript in self.responses:
+            return self.responses[transcript]
+        return json.dumps(self.rule_play(transcript, prompt))
+
+    @staticmethod
+    def rule_play(transcript: str, prompt: str) -> dict:
+        from fix_hit_info import PITCH_TYPES, classify_transcript
+        from parse_play import COUNT_PATTERN, OUTS_PATTERN, SCORE_PATTERN
+
+        keywords = classify_transcript(transcript)
+        play = {
+            "play_type": keywords.play_type or "in_play",
+            "hit_type": keywords.hit_type,
+            "hit_direction": keywords.hit_direction,
+            "at_bat_complete": keywords.play_type not in PITCH_TYPES,
+            "raw_transcript": transcript,
+        }
+        count = COUNT_PATTERN.search(transcript)
+        if count:
+            play["balls"], play["strikes"] = int(count.group(1)), int(count.group(2))
+        score = SCORE_PATTERN.search(transcript)
+        if score:
+            play["away_score_snapshot"], play["home_score_snapshot"] = int(score.group(1)), int(score.group(2))
+        outs = OUTS_PATTERN.search(transcript)
+        if outs:
+            after = 0 if outs.group(1).lower() == "no" else int(outs.group(1))
+            before = CONTEXT_OUTS_PATTERN.search(prompt)
+            play["outs_after_play"] = after
+            play["outs_made"] = max(after - int(before.group(1)), 0) if before else 0
+        return play
+
+
+BACKENDS = {
+    OllamaBackend.name: OllamaBackend,
+    LlamaCppBackend.name: LlamaCppBackend,
+    StubBackend.name: StubBackend,
+}
+
+# Loaded backends, keyed by (name, model, temperature)
+_loaded: Dict[Tuple[str, str, float], LLMBackend] = {}
+
+
+def get_llm(
+    model: Optional[str] = None,
+    temperature: float = 0.0,
+    name: Optional[str] = None,
+) -> LLMBackend:
+    """Return a loaded LLM backend, defaulting to config.LLM_BACKEND and config.LLM_MODEL."""
+    name = name or config.LLM_BACKEND
+    model = model or config.LLM_MODEL
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name} (choose from {', '.join(BACKENDS)})")
+
+    key = (name, model, temperature)
+    if key not in _loaded:
+        backend = BACKENDS[name](model, temperature)
+        with span("llm_load"):
+            backend.load()
+        _loaded[key] = backend
+    return _loaded[key]
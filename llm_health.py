@@ -0,0 +1,96 @@
+# llm_health.py - Warm the Ollama model at startup and fall back to a smaller one if it's too slow
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Optional
+
+import config
+from tracing import span
+
+PROBE_PROMPT = "Reply with OK."
+
+
+@dataclass
+class ModelHealth:
+    model: str
+    # Seconds to load the model into Ollama (None if it couldn't be reached)
+    warmup_seconds: Optional[float] = None
+    # Seconds until the first generated token once loaded
+    first_token_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _generate(body: dict, timeout: float) -> dict:
+    request = urllib.request.Request(
+        config.OLLAMA_BASE_URL.rstrip("/") + "/api/generate",
+        data=json.dumps(dict(body, stream=False)).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+def warm_up(model: str, timeout: float = 300.0) -> float:
+    """
+    Load model into Ollama and keep it resident for config.LLM_KEEP_ALIVE
+    (an empty prompt only loads the model). Returns the seconds it took.
+    """
+    start = time.perf_counter()
+    with span("llm_warmup"):
+        _generate({"model": model, "prompt": "", "keep_alive": config.LLM_KEEP_ALIVE}, timeout)
+    return time.perf_counter() - start
+
+
+def probe_latency(model: str, timeout: float = 60.0) -> float:
+    """Seconds for the loaded model to produce its first token of a short prompt."""
+    options = {"num_predict": 1}
+    if config.LLM_NUM_THREAD:
+        options["num_thread"] = config.LLM_NUM_THREAD
+    body = {"model": model, "prompt": PROBE_PROMPT, "keep_alive": config.LLM_KEEP_ALIVE, "options": options}
+    start = time.perf_counter()
+    with span("llm_first_token"):
+        _generate(body, timeout)
+    return time.perf_counter() - start
+
+
+def check_model(model: str) -> ModelHealth:
+    health = ModelHealth(model)
+    try:
+        health.warmup_seconds = warm_up(model)
+        health.first_token_seconds = probe_latency(model)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        health.error = f"{type(e).__name__}: {e}"
+    return health
+
+
+def ensure_model(budget: Optional[float] = None) -> ModelHealth:
+    """
+    Warm and probe config.LLM_MODEL. If its first-token latency is over budget
+    (config.LLM_FIRST_TOKEN_BUDGET) and config.LLM_FALLBACK_MODEL is set, warm
+    the fallback and, if it is faster, make it the parsing model.
+    Returns the health of the model that parsing will use.
+    """
+    budget = config.LLM_FIRST_TOKEN_BUDGET if budget is None else budget
+    health = check_model(config.LLM_MODEL)
+    if health.error or health.first_token_seconds <= budget or not config.LLM_FALLBACK_MODEL:
+        return health
+
+    fallback = check_model(config.LLM_FALLBACK_MODEL)
+    if fallback.error is None and fallback.first_token_seconds < health.first_token_seconds:
+        config.LLM_MODEL = fallback.model
+        return fallback
+    return health
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Warm the parsing model in Ollama and report its latency")
+    arg_parser.add_argument("--model", default=config.LLM_MODEL)
+    args = arg_parser.parse_args()
+
+    result = check_model(args.model)
+    if result.error:
+        raise SystemExit(f"{result.model}: {result.error}")
+    print(f"{result.model}: load {result.warmup_seconds:.2f}s, first token {result.first_token_seconds:.2f}s")
@@ -0,0 +1,141 @@
+# log_setup.py - Queue-based logging: callers only enqueue, a background thread formats and writes
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import time
+import uuid
+from typing import Optional
+
+import config
+from tracing import Span, tracer
+
+# Extra fields copied into every JSON log line when a record has them
+STRUCTURED_FIELDS = ("game_id", "play_index", "stage", "latency_ms")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_exit_registered = False
+
+
+class ContextFilter(logging.Filter):
+    """Tags records with the game id and the index of the play being processed."""
+
+    def __init__(self, game_id: str):
+        super().__init__()
+        self.game_id = game_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "game_id"):
+            record.game_id = self.game_id
+        if not hasattr(record, "play_index"):
+            record.play_index = tracer.play_index
+        return True
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps the traceback apart from the message. The stock
+    prepare() merges it into msg, so JsonFormatter could never write it as its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # Formatted here: the traceback's frames shouldn't outlive the call
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in STRUCTURED_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+def log_span(span: Span):
+    """Tracer listener: every timed stage as a DEBUG record with its latency."""
+    logging.getLogger("sarg.trace").debug(
+        "%s took %.1f ms",
+        span.stage,
+        span.wall_ms,
+        extra={"stage": span.stage, "latency_ms": round(span.wall_ms, 3), "play_index": span.play_index},
+    )
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    game_id: Optional[str] = None,
+) -> str:
+    """
+    Route all logging through a queue. The calling thread only puts records on
+    the queue; a QueueListener thread writes them to the console and, as JSON
+    lines, to a rotating file (config.LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS).
+    Python warnings and the tracer's stage timings are logged too.
+    Returns the game id tagged on every record.
+    """
+    global _listener, _exit_registered
+    level = level or config.LOG_LEVEL
+    log_file = config.LOG_FILE if log_file is None else log_file
+    game_id = game_id or uuid.uuid4().hex[:12]
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S"))
+    handlers = [console]
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUPS, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = TracebackQueueHandler(log_queue)
+    # Tagged before enqueueing, while play_index still belongs to this record
+    queue_handler.addFilter(ContextFilter(game_id))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    logging.captureWarnings(True)
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    if not _exit_registered:
+        atexit.register(stop_logging)
+        _exit_registered = True
+
+    if log_span not in tracer.listeners:
+        tracer.listeners.append(log_span)
+    return game_id
+
+
+def stop_logging():
+    """Flush the queue and stop the writer thread."""
+    global _listener, _exit_registered
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,21 +1,31 @@
 #main.py
+import logging
 import shutil
 import os
 import subprocess
 import sys
+import time
 import warnings
+import config
 from gamestate import GameState
-from parse_play import parse_transcript
-from speech import transcribe_audio, clean_transcript, standardize_transcript
-from recorder import record_audio
 from userinterf import GameGUI, QApplication
 from urllib3.exceptions import NotOpenSSLWarning
-from fix_hit_info import fix_play_info, extract_bases
+from log_setup import setup_logging
+from tracing import tracer
 
 #ignore unncessary warnings
 
 warnings.filterwarnings("ignore", category=NotOpenSSLWarning)
-sys.stderr = open(os.devnull, "w")
+
+# Log records are written by a background thread (console and rotating JSON
+# file, see log_setup.py), so logging doesn't wait on I/O between plays
+setup_logging()
+logger = logging.getLogger("sarg.main")
+
+if config.TRACE_FILE:
+    tracer.export_jsonl(config.TRACE_FILE)
+if config.METRICS_PORT:
+    tracer.serve_metrics(config.METRICS_PORT)
 
 app = QApplication(sys.argv)
 
@@ -25,6 +35,38 @@ game = GameState(home_team="HOME", away_team="AWAY")
 # Create and show GUI
 gui = GameGUI(game)
 gui.show()
+# Paint the window now, before the audio/LLM pipeline is imported and loaded
+app.processEvents()
+
+# Pipeline modules are imported after the window is up. whisper, langchain and
+# the Ollama client are loaded lazily on first use inside these modules.
+from multi_play import parse_plays
+from parse_play import fast_parse
+from speculative import SpeculativeParser, transcribe_speculatively
+from speech import attach_transcription, transcribe_with_details, clean_transcript, standardize_transcript
+from run_expectancy import get_model, situation
+
+# Load the parsing model now so the first play doesn't wait for it
+if config.LLM_WARMUP and config.LLM_BACKEND != "ollama":
+    from llm_backend import get_llm
+
+    get_llm()
+elif config.LLM_WARMUP:
+    from llm_health import ensure_model
+
+    health = ensure_model()
+    if health.error:
+        logger.warning("LLM warm-up failed (%s): %s", health.model, health.error)
+    else:
+        logger.info(
+            "LLM %s: load %.2fs, first token %.2fs",
+            health.model,
+            health.warmup_seconds,
+            health.first_token_seconds,
+        )
+
+# Build the RE24 / win-probability tables now too, not on the first play
+get_model()
 
 # Audio files to process
 play_files = ["demo1.mp3","demo2.mp3","demo3.mp3","demo4.mp3"]
@@ -33,55 +75,87 @@ all_game_states = []
 all_transcripts = []
 initial_transcripts = []
 
-for plays in play_files:
+speculator = SpeculativeParser(game)
+
+
+def show_preview(text):
+    gui.show_preview(text)
+    app.processEvents()
+
+
+for play_index, plays in enumerate(play_files):
+    tracer.set_play(play_index)
     #transcribe audio 
-    transcript = transcribe_audio(plays)
+    # When the clip is handed over; the latency below runs from here, so it covers
+    # transcription and parsing but not how long ago the announcement ended
+    clip_received_at = time.time()
+    if config.SPECULATIVE_STEP_SECONDS:
+        transcription = transcribe_speculatively(
+            plays, speculator, show_preview, config.SPECULATIVE_STEP_SECONDS
+        )
+    else:
+        transcription = transcribe_with_details(plays)
+    transcript = transcription.text
     initial_transcripts.append(transcript)
     transcript = clean_transcript(transcript)
     transcript = standardize_transcript(transcript)
     all_transcripts.append(transcript)
+    # Single pitch calls are parsed by rules; a matching speculative play is committed
+    # with the outs and score of the full announcement
+    fast_play = speculator.finish(transcript) if config.SPECULATIVE_STEP_SECONDS else fast_parse(transcript)
 
     if "undo" in transcript.lower():
-        print("Undo play")
+        logger.info("Undo play")
         if game.undo_last_play():
-            print("Undid last play")
+            logger.info("Undid last play")
             gui.update_display()
+            app.processEvents()
         else:
-            print("Nothing to undo")
+            logger.info("Nothing to undo")
         continue  
-    # add current gamestate context to transcript
-    current_bases = game.bases.snapshot()
-    current_count = f"{game.balls}-{game.strikes}"
-    current_outs = game.outs
-    context_info = (
-        f"\nCurrent game state - Count: {current_count}, Outs: {current_outs}"
-    )
-    if any(current_bases.values()):
-        runners_info = ", ".join(
-            [f"{base}: {player}" for base, player in current_bases.items() if player]
-        )
-        context_info += f", Runners: {runners_info}"
-    else:
-        context_info += ", Bases empty"
 
-    transcript_with_context = transcript + context_info
-    
-    # Step 2: Parse transcript into structured Play object using LLM
-    play = parse_transcript(transcript)
-    play = fix_play_info(play, transcript)  
-    play = extract_bases(play, transcript) 
+    # Step 2: Parse transcript into structured Play object using LLM, with the
+    # current bases, count and outs as context (low-confidence parses are retried,
+    # see confidence.py)
+    # One announcement can hold several events ("ball two, then he fouls it off"),
+    # see multi_play.py
+    clip_plays = [fast_play] if fast_play else parse_plays(transcript, game, transcription.segments, fast=False)
+    for play in clip_plays:
+        attach_transcription(play, transcription, plays)
+        play.clip_received_at = clip_received_at
+    play = clip_plays[-1]
     
     try:
-        game.update(play) 
-        print(game)
+        before = situation(game)
+        # All of the announcement's plays are applied, or none of them
+        runs = game.apply_plays(clip_plays)
+        metrics = get_model().evaluate(before, situation(game), runs)
+        logger.info("%s", game)
+        logger.info(
+            "RE24: %+.3f, WPA: %+.3f, Home win probability: %.1f%%",
+            metrics.re24,
+            metrics.wpa,
+            metrics.wp_after * 100,
+        )
+        logger.info("Parse confidence: %s", ", ".join(f"{p.confidence:.2f}" for p in clip_plays))
         gui.refresh_after_play(play)
+        app.processEvents()
+        displayed_at = time.time()
+        for p in clip_plays:
+            p.displayed_at = displayed_at
+        latency = displayed_at - clip_received_at
+        logger.info(
+            "Clip received to scoreboard: %.2fs",
+            latency,
+            extra={"stage": "clip_to_scoreboard", "latency_ms": round(latency * 1000, 3)},
+        )
     except ValueError as e:
-        print(f"Play validation failed: {e}")
+        logger.warning("Play validation failed: %s", e)
 
     game_str = str(game)
     all_game_states.append(game_str)
 
-print("=" * 60 + "\n")
+logger.info("Processed %d clips", len(play_files))
 
 
 # exit 
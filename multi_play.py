@@ -0,0 +1,158 @@
+# multi_play.py - Split announcements that describe several events into one Play per event
+import re
+from typing import List, Optional
+
+from confidence import parse_with_confidence
+from fix_hit_info import PITCH_TYPES, batter_name, classify_transcript
+from llm_backend import get_llm
+from parse_play import fast_parse
+from schema import Play
+from tracing import span, traced
+
+# Clause boundaries: sentence and comma breaks, optionally followed by "and then"
+CLAUSE_SPLIT = re.compile(r"[.,]\s+(?:and\s+)?(?:then\s+)?|\s+(?:and\s+)?then\s+", re.IGNORECASE)
+
+# Outcomes decided by the pitch just called: "ball four, walks" is one event
+ENDED_BY_PITCH = {
+    "walk": {"ball"},
+    "strikeout": {"called_strike", "swinging_strike"},
+}
+
+# Words that stand for the batter already named earlier in the announcement
+PRONOUNS = {"he", "she", "they"}
+
+SPLIT_PROMPT = """Split this baseball announcement into the separate events it describes, in order, one event per line.
+Start each line with the player's name, keep the count, bases, outs and score with the event they follow,
+and do not add, number or explain anything.
+
+Announcement: {transcript}
+Events:"""
+
+
+def split_transcript(transcript: str) -> Optional[List[str]]:
+    """
+    Rule-based segmentation into one text per event. Each clause naming a play
+    type starts a new event, except the same pitch named again and an outcome
+    decided by the pitch before it; clauses without one (count, bases, outs,
+    score) stay with the event before. Returns None when a clause names two
+    different play types (ambiguous).
+
+    >>> split_transcript("Bo takes a ball, then he fouls it off, Count: 1-1")
+    ['Bo takes a ball', 'he fouls it off, Count: 1-1']
+    >>> split_transcript("Bo takes a ball, ball four, walks. Runner on first: Bo")
+    ['Bo takes a ball, ball four, walks. Runner on first: Bo']
+    """
+    events: List[List[str]] = []
+    event_types: List[str] = []
+    leading: List[str] = []
+    for clause in CLAUSE_SPLIT.split(transcript):
+        clause = clause.strip(" ,.")
+        if not clause:
+            continue
+        types = {h.value for h in classify_transcript(clause).hits if h.field_name == "play_type"}
+        if len(types) > 1:
+            return None
+        play_type = next(iter(types), None)
+        # The same pitch named again ("takes a ball, ball four") or the outcome
+        # it decides ("ball four, walks") belongs to the current event
+        continues = bool(event_types) and (
+            (play_type == event_types[-1] and play_type in PITCH_TYPES)
+            or event_types[-1] in ENDED_BY_PITCH.get(play_type, ())
+        )
+        if not types or continues:
+            if events:
+                events[-1].append(clause)
+                if types:
+                    event_types[-1] = play_type
+            else:
+                leading.append(clause)
+            continue
+        events.append(leading + [clause])
+        event_types.append(play_type)
+        leading = []
+
+    if len(events) <= 1:
+        return [transcript]
+    return [", ".join(clauses) for clauses in events]
+
+
+@traced("split_with_llm")
+def split_with_llm(transcript: str) -> List[str]:
+    """Ask the LLM to split an announcement the rules couldn't (falls back to one event)."""
+    response = get_llm().complete(SPLIT_PROMPT.format(transcript=transcript))
+    events = [line.strip(" -*\t") for line in response.splitlines()]
+    events = [re.sub(r"^\d+[.)]\s*", "", event) for event in events if event]
+    return events or [transcript]
+
+
+def _pitch_play(text: str) -> Optional[Play]:
+    """A pitch call without the count that ends a full announcement ("ball two, then ...")."""
+    match = classify_transcript(text)
+    if match.play_type not in PITCH_TYPES or match.confidence < 1.0:
+        return None
+    action = next(h for h in match.hits if h.field_name == "play_type")
+    return Play(
+        play_type=match.play_type,
+        batter=batter_name(text, action.start),
+        raw_transcript=text,
+        confidence=match.confidence,
+    )
+
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+def _segments_for(part: str, parts: List[str], segments: Optional[List[dict]]) -> Optional[List[dict]]:
+    """
+    The segments whose text overlaps one event: those containing a word of the
+    event that no other event has. None when there is no such segment, so the
+    event's confidence doesn't rest on another event's speech.
+    """
+    if not segments:
+        return None
+    others = set()
+    for other in parts:
+        if other is not part:
+            others.update(WORD.findall(other.lower()))
+    own = set(WORD.findall(part.lower())) - others
+    overlapping = [s for s in segments if own & set(WORD.findall(s.get("text", "").lower()))]
+    return overlapping or None
+
+
+def parse_plays(
+    transcript: str,
+    game,
+    segments: Optional[List[dict]] = None,
+    fast: bool = True,
+) -> List[Play]:
+    """
+    Parse an announcement into its plays, in order. Single-event announcements
+    go through the usual fast_parse / parse_with_confidence path (fast=False
+    skips fast_parse, for callers that already tried it). For several events,
+    each one after the first is parsed against a copy of the game with the
+    earlier ones applied, so its context is the state it happened in. Each
+    event is scored only against the segments of its own speech.
+    Apply the result with GameState.apply_plays.
+    """
+    parts = split_transcript(transcript)
+    if parts is None:
+        with span("split_llm"):
+            parts = split_with_llm(transcript)
+    if len(parts) == 1:
+        return [(fast and fast_parse(transcript)) or parse_with_confidence(transcript, game, segments)]
+
+    scratch = game.copy()
+    plays: List[Play] = []
+    batter = None
+    for part in parts:
+        play = (
+            fast_parse(part)
+            or _pitch_play(part)
+            or parse_with_confidence(part, scratch, _segments_for(part, parts, segments))
+        )
+        if play.batter is None or play.batter.lower() in PRONOUNS:
+            play.batter = batter
+        batter = play.batter
+        scratch.apply_unchecked(play.model_copy(deep=True))
+        plays.append(play)
+    return plays
@@ -0,0 +1,106 @@
+# ollama_stub.py - Local stand-in for the Ollama server that replays recorded responses
+import json
+import re
+import threading
+import urllib.request
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# parse_play's prompt ends with the transcript in quotes after this marker
+TRANSCRIPT_PATTERN = re.compile(r'NOW PARSE THIS TRANSCRIPT:\s*"(.*?)"\s*\n', re.DOTALL)
+
+
+def extract_transcript(prompt: str) -> str:
+    """Pull the transcript back out of a rendered parse_play prompt."""
+    match = TRANSCRIPT_PATTERN.search(prompt)
+    return match.group(1).strip() if match else prompt.strip()
+
+
+class OllamaStub:
+    """
+    Serves /api/generate from a transcript -> response text mapping.
+
+    In record mode, unknown transcripts are forwarded to a real Ollama server
+    (upstream) and its responses are kept, so save() can write the mapping
+    for later replays.
+    """
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None, upstream: Optional[str] = None):
+        self.responses: Dict[str, str] = dict(responses or {})
+        self.upstream = upstream
+        self.misses = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def from_file(cls, path: str, upstream: Optional[str] = None) -> "OllamaStub":
+        try:
+            with open(path) as f:
+                responses = json.load(f)
+        except FileNotFoundError:
+            responses = {}
+        return cls(responses, upstream)
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.responses, f, indent=2)
+
+    def respond(self, request: dict) -> Optional[str]:
+        """Return the recorded response for a generate request, recording it if needed."""
+        transcript = extract_transcript(request.get("prompt", ""))
+        if transcript not in self.responses and self.upstream:
+            forwarded = dict(request, stream=False)
+            req = urllib.request.Request(
+                f"{self.upstream.rstrip('/')}/api/generate",
+                data=json.dumps(forwarded).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(req) as resp:
+                self.responses[transcript] = json.load(resp)["response"]
+        return self.responses.get(transcript)
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a daemon thread and return the base URL to give the Ollama client."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                text = stub.respond(request)
+                if text is None:
+                    stub.misses += 1
+                    self.send_error(404, "No recorded response for this transcript")
+                    return
+
+                message = {
+                    "model": request.get("model", "stub"),
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "response": text,
+                    "done": True,
+                    "done_reason": "stop",
+                }
+                # The client streams by default and reads one JSON object per line
+                body = (json.dumps(message) + "\n").encode()
+                content_type = "application/x-ndjson" if request.get("stream", True) else "application/json"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -1,17 +1,16 @@
 # parse_play.py
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_ollama.llms import OllamaLLM
-from langchain.prompts import PromptTemplate
-from schema import Play
-from pydantic import BaseModel
+import re
+from typing import Optional
 
-#Parse is resticted to a "Play"
-#Created to include data needed for gamestate management
-parser = PydanticOutputParser(pydantic_object=Play)
+import config
+from fix_hit_info import PITCH_TYPES, batter_name, classify_transcript
+from llm_backend import get_llm
+from schema import Play
+from tracing import traced
 
-prompt = PromptTemplate(
-    template="""You are a baseball scorekeeping assistant. Parse the transcript into JSON.
+# langchain and the LLM engines take seconds to import, so the chain is only
+# built when the first transcript is parsed (see get_chain).
+PROMPT_TEMPLATE = """You are a baseball scorekeeping assistant. Parse the transcript into JSON.
 
 {format_instructions}
 
@@ -47,7 +46,8 @@ CRITICAL PARSING RULES:
    - Example: "count, zero one" = balls: 0, strikes: 1
 
 4. RUNNERS - THIS IS CRITICAL:
-   - ALWAYS check "Current game state" for who's on base BEFORE the play
+   - ALWAYS check "GAME STATE BEFORE THIS PLAY" for who's on base BEFORE the play
+   - Runners listed there who aren't mentioned in the transcript stay where they are; don't add movements for them
    - NEW CRITICAL RULE: You MUST include a RunnerMovement entry for every player whose name is mentioned with a base movement in the transcript (e.g., "Will to third").
    - **CRITICAL EXPLICIT MOVEMENT:** If the transcript specifies a runner's movement (e.g., "Shohei moves to third," "Will to second"), you **MUST** create a RunnerMovement entry.
    - **END BASE INSTRUCTION:** The base mentioned immediately following phrases like "moves to," "to," or "goes to" is the runner's **FINAL DESTINATION** and **MUST** be placed in the `end_base` field (e.g., "first", "second", "third", or "home").
@@ -119,6 +119,9 @@ CRITICAL PARSING RULES:
 EXAMPLES (MATCH THESE PATTERNS EXACTLY):
 [Keep all your previous examples from Example 1 → Example 9, same as before]
 
+GAME STATE BEFORE THIS PLAY (bases: 1/2/3 = occupied, - = empty):
+{context}
+
 NOW PARSE THIS TRANSCRIPT:
 "{transcript}"
 
@@ -127,19 +130,102 @@ KEY REMINDERS:
 - Fouls ALWAYS get outs_made = 0
 - The outs mentioned in transcript = current game state, NOT this play's outs_made
 - Include hit_type and hit_direction when possible
-""",
-    input_variables=["transcript"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
-)
-
-#Best parameter combination found as of now.
-llm = OllamaLLM(model="llama3.1", temperature=0, top_p=1, repeat_penalty=1, mirostat=0)
-
-chain = prompt | llm | parser
-
-
-def parse_transcript(transcript_text: str):
-    result = chain.invoke({"transcript": transcript_text})
+"""
+
+# Built chains, keyed by (backend, model, temperature)
+_chains = {}
+
+
+def get_chain(model: Optional[str] = None, temperature: float = 0.0):
+    """Build the prompt | llm | parser chain on first use and reuse it afterwards."""
+    model = model or config.LLM_MODEL
+    key = (config.LLM_BACKEND, model, temperature)
+    if key not in _chains:
+        from langchain_core.output_parsers import PydanticOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        #Parse is resticted to a "Play"
+        #Created to include data needed for gamestate management
+        parser = PydanticOutputParser(pydantic_object=Play)
+
+        prompt = PromptTemplate(
+            template=PROMPT_TEMPLATE,
+            input_variables=["transcript", "context"],
+            partial_variables={"format_instructions": parser.get_format_instructions()},
+        )
+
+        # The engine (Ollama, llama.cpp or the stub) is chosen in config, see llm_backend.py
+        _chains[key] = prompt | get_llm(model, temperature).runnable() | parser
+    return _chains[key]
+
+
+def format_context(game) -> str:
+    """
+    Compact one-line game state for the prompt, e.g.
+        bases=1-3 (1B Bo, 3B Neil) count=1-2 outs=1
+    """
+    slots = game.bases.slots
+    bases = "".join(str(i + 1) if runner else "-" for i, runner in enumerate(slots))
+    names = ", ".join(f"{i + 1}B {runner}" for i, runner in enumerate(slots) if runner)
+    if names:
+        bases += f" ({names})"
+    return f"bases={bases} count={game.balls}-{game.strikes} outs={game.outs}"
+
+
+# ASR output isn't reliably capitalized, so the announcement labels match in any case
+COUNT_PATTERN = re.compile(r"Count: (\d)-(\d)", re.IGNORECASE)
+OUTS_PATTERN = re.compile(r"\b(No|\d) outs?\b", re.IGNORECASE)
+SCORE_PATTERN = re.compile(r"Score: (\d+)-(\d+)", re.IGNORECASE)
+
+
+@traced("fast_parse")
+def fast_parse(transcript_text: str) -> Optional[Play]:
+    """
+    Parse without the LLM: unambiguous pitch calls ("Bo takes a ball. Count: 1-0. ...")
+    by the keyword rules, then plays without runner movements to work out by
+    the trained classifier (see play_classifier.py), when one is configured.
+    Returns None for anything else, which then goes to parse_transcript.
+    """
+    match = classify_transcript(transcript_text)
+    # Several calls ("takes a ball, then fouls it off") are separate plays, see multi_play.py
+    if sum(h.field_name == "play_type" for h in match.hits) > 1:
+        return None
+    count = COUNT_PATTERN.search(transcript_text)
+    if match.play_type not in PITCH_TYPES or match.confidence < 1.0 or not count:
+        from play_classifier import classify_play
+
+        return classify_play(transcript_text)
+
+    action = next(h for h in match.hits if h.field_name == "play_type")
+    batter = batter_name(transcript_text, action.start)
+    play = Play(
+        play_type=match.play_type,
+        batter=batter,
+        balls=int(count.group(1)),
+        strikes=int(count.group(2)),
+        raw_transcript=transcript_text,
+        confidence=match.confidence,
+    )
+
+    outs = OUTS_PATTERN.search(transcript_text)
+    if outs:
+        play.outs_after_play = 0 if outs.group(1).lower() == "no" else int(outs.group(1))
+    score = SCORE_PATTERN.search(transcript_text)
+    if score:
+        play.away_score_snapshot = int(score.group(1))
+        play.home_score_snapshot = int(score.group(2))
+    return play
+
+
+@traced("parse_transcript")
+def parse_transcript(
+    transcript_text: str,
+    context: str = "unknown",
+    model: Optional[str] = None,
+    temperature: float = 0.0,
+):
+    """Parse a transcript into a Play; context is the format_context() of the game before it."""
+    result = get_chain(model, temperature).invoke({"transcript": transcript_text, "context": context})
     return result
 
 
@@ -0,0 +1,373 @@
+# play_classifier.py - Small local classifier for play_type, hit_type and hit_direction
+import argparse
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from schema import Play
+
+FIELDS = ("play_type", "hit_type", "hit_direction")
+# Label for fields the play doesn't have (e.g. no hit_type on a pitch)
+NONE_LABEL = "none"
+
+FEATURE_BITS = 14
+N_FEATURES = 2**FEATURE_BITS
+# Character n-grams of 2 up to this many bytes
+MAX_NGRAM = 4
+
+# Outcomes the LLM has nothing to add to, with the outs each makes: runners
+# are forced (GameState derives the moves, see base_out) or hold
+NO_RUNNER_OUTCOMES = {"walk": 0, "hit_by_pitch": 0, "strikeout": 1}
+# Batted outs, only taken without the LLM when the bases are announced empty
+BATTED_OUTS = {"ground_out", "fly_out", "line_out", "pop_out"}
+
+# Rolling hash of the n-gram bytes, then Fibonacci hashing down to FEATURE_BITS
+# (deterministic across runs, unlike hash())
+HASH_BASE = np.uint64(257)
+HASH_MIX = np.uint64(0x9E3779B97F4A7C15)
+HASH_SHIFT = np.uint64(64 - FEATURE_BITS)
+
+
+def normalize(text: str) -> str:
+    return " " + re.sub(r"\s+", " ", text.lower()).strip() + " "
+
+
+def hashed_counts(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature indices of the character n-grams in text and how often each occurs."""
+    codes = np.frombuffer(normalize(text).encode(), dtype=np.uint8).astype(np.uint64)
+    # Each size extends the previous one by a byte. Printable bytes (>= 32) keep
+    # the raw hashes of different sizes in disjoint ranges, so they can't collide.
+    hashes = []
+    h = codes
+    for n in range(2, min(MAX_NGRAM, len(codes)) + 1):
+        h = h[:-1] * HASH_BASE + codes[n - 1 :]
+        hashes.append(h)
+    mixed = (np.concatenate(hashes) * HASH_MIX) >> HASH_SHIFT
+    return np.unique(mixed.astype(np.int64), return_counts=True)
+
+
+class PlayClassifier:
+    """
+    Hashed character n-gram TF-IDF features and one softmax regression per
+    field, trained with mini-batch Adam. Predicting one transcript is one
+    gather and sum over its few hundred n-grams for all fields at once.
+    """
+
+    def __init__(self, idf: np.ndarray, heads: Dict[str, Tuple[List[str], np.ndarray, np.ndarray]]):
+        self.idf = idf
+        # field -> (class labels, weights (N_FEATURES, classes), bias (classes,))
+        self.heads = heads
+        self._stacked = None
+
+    def _stack(self):
+        """All heads side by side, so predict() gathers the weight rows once."""
+        classes = [c for c, _w, _b in self.heads.values()]
+        bounds = np.cumsum([0] + [len(c) for c in classes])
+        self._stacked = (
+            list(zip(self.heads, classes, bounds[:-1], bounds[1:])),
+            np.hstack([w for _c, w, _b in self.heads.values()]),
+            np.concatenate([b for _c, _w, b in self.heads.values()]),
+        )
+
+    def features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse L2-normalized TF-IDF vector as (indices, values)."""
+        indices, counts = hashed_counts(text)
+        values = counts * self.idf[indices]
+        return indices, values / (np.linalg.norm(values) or 1.0)
+
+    def predict(self, text: str) -> Dict[str, Tuple[Optional[str], float]]:
+        """Most likely value and its probability per field (None for NONE_LABEL)."""
+        if self._stacked is None:
+            self._stack()
+        heads, weights, bias = self._stacked
+        indices, values = self.features(text)
+        all_logits = values @ weights[indices] + bias
+        result = {}
+        for field_name, classes, start, end in heads:
+            logits = all_logits[start:end]
+            probs = np.exp(logits - logits.max())
+            best = int(probs.argmax())
+            label = classes[best]
+            result[field_name] = (None if label == NONE_LABEL else label, float(probs[best] / probs.sum()))
+        return result
+
+    @classmethod
+    def fit(
+        cls,
+        texts: List[str],
+        labels: Dict[str, List[str]],
+        epochs: int = 5,
+        batch_size: int = 256,
+        learning_rate: float = 0.05,
+        l2: float = 1e-6,
+        seed: int = 0,
+    ) -> "PlayClassifier":
+        rows = [hashed_counts(text) for text in texts]
+        document_freq = np.zeros(N_FEATURES)
+        for indices, _counts in rows:
+            document_freq[indices] += 1
+        idf = (np.log((1 + len(texts)) / (1 + document_freq)) + 1).astype(np.float32)
+        model = cls(idf, {})
+        rows = [model.features(text) for text in texts]
+
+        targets = {}
+        for field_name in FIELDS:
+            classes = sorted(set(labels[field_name]))
+            index = {label: i for i, label in enumerate(classes)}
+            targets[field_name] = np.array([index[label] for label in labels[field_name]])
+            model.heads[field_name] = (
+                classes,
+                np.zeros((N_FEATURES, len(classes)), dtype=np.float32),
+                np.zeros(len(classes), dtype=np.float32),
+            )
+        # Adam moments per head parameter
+        moments = {
+            name: [np.zeros_like(p) for p in (w, b) for _ in range(2)]
+            for name, (_c, w, b) in model.heads.items()
+        }
+
+        rng = np.random.default_rng(seed)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+        for _epoch in range(epochs):
+            order = rng.permutation(len(rows))
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                x = np.zeros((len(batch), N_FEATURES), dtype=np.float32)
+                for r, i in enumerate(batch):
+                    x[r, rows[i][0]] = rows[i][1]
+                step += 1
+                for field_name, (_classes, weights, bias) in model.heads.items():
+                    logits = x @ weights + bias
+                    probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+                    probs /= probs.sum(axis=1, keepdims=True)
+                    probs[np.arange(len(batch)), targets[field_name][batch]] -= 1
+                    probs /= len(batch)
+                    grads = (x.T @ probs + l2 * weights, probs.sum(axis=0))
+                    m_w, v_w, m_b, v_b = moments[field_name]
+                    for param, grad, m, v in ((weights, grads[0], m_w, v_w), (bias, grads[1], m_b, v_b)):
+                        m *= beta1
+                        m += (1 - beta1) * grad
+                        v *= beta2
+                        v += (1 - beta2) * grad * grad
+                        m_hat = m / (1 - beta1**step)
+                        v_hat = v / (1 - beta2**step)
+                        param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+        return model
+
+    def save(self, path: str):
+        arrays = {"idf": self.idf}
+        for field_name, (classes, weights, bias) in self.heads.items():
+            arrays[f"{field_name}_classes"] = np.array(classes)
+            arrays[f"{field_name}_weights"] = weights
+            arrays[f"{field_name}_bias"] = bias
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "PlayClassifier":
+        with np.load(path) as data:
+            heads = {
+                field_name: (
+                    data[f"{field_name}_classes"].tolist(),
+                    data[f"{field_name}_weights"],
+                    data[f"{field_name}_bias"],
+                )
+                for field_name in FIELDS
+            }
+            return cls(data["idf"], heads)
+
+
+_model: Optional[PlayClassifier] = None
+_model_path: Optional[str] = None
+
+
+def get_classifier() -> Optional[PlayClassifier]:
+    """The model at config.PLAY_CLASSIFIER, or None when it's disabled or not trained yet."""
+    global _model, _model_path
+    if not config.PLAY_CLASSIFIER:
+        return None
+    if _model_path != config.PLAY_CLASSIFIER:
+        _model_path = config.PLAY_CLASSIFIER
+        try:
+            _model = PlayClassifier.load(config.PLAY_CLASSIFIER)
+        except FileNotFoundError:
+            _model = None
+    return _model
+
+
+def classify_play(transcript: str) -> Optional[Play]:
+    """
+    Build a Play from the classifier alone when the LLM wouldn't add anything:
+    a pitch call with its count, a walk, hit by pitch or strikeout, a home run
+    with the score, or a batted out that leaves the bases empty. Anything with
+    runner movements to work out returns None and goes to the LLM.
+    """
+    from fix_hit_info import PITCH_TYPES, batter_name
+    from parse_play import COUNT_PATTERN, OUTS_PATTERN, SCORE_PATTERN
+
+    model = get_classifier()
+    if model is None:
+        return None
+    predicted = model.predict(transcript)
+    play_type, probability = predicted["play_type"]
+    if play_type is None or probability < config.CLASSIFIER_THRESHOLD:
+        return None
+
+    count = COUNT_PATTERN.search(transcript)
+    score = SCORE_PATTERN.search(transcript)
+    if play_type in PITCH_TYPES:
+        simple = count is not None
+    elif play_type == "home_run":
+        simple = score is not None  # a home run sets the score from the announcement
+    elif play_type in BATTED_OUTS:
+        simple = "bases empty" in transcript.lower()
+    else:
+        simple = play_type in NO_RUNNER_OUTCOMES
+    if not simple:
+        return None
+
+    batter = batter_name(transcript)
+    play = Play(
+        play_type=play_type,
+        batter=batter,
+        raw_transcript=transcript,
+        confidence=round(probability, 3),
+        at_bat_complete=play_type not in PITCH_TYPES,
+        outs_made=1 if play_type in BATTED_OUTS else NO_RUNNER_OUTCOMES.get(play_type, 0),
+    )
+    for field_name in ("hit_type", "hit_direction"):
+        value, field_probability = predicted[field_name]
+        if value is not None and field_probability >= config.CLASSIFIER_THRESHOLD:
+            setattr(play, field_name, value)
+    if count:
+        play.balls, play.strikes = int(count.group(1)), int(count.group(2))
+    outs = OUTS_PATTERN.search(transcript)
+    if outs:
+        play.outs_after_play = 0 if outs.group(1).lower() == "no" else int(outs.group(1))
+    if score:
+        play.away_score_snapshot = int(score.group(1))
+        play.home_score_snapshot = int(score.group(2))
+    return play
+
+
+def _example(transcript: str, play: dict) -> Tuple[str, Dict[str, str]]:
+    from speech import clean_transcript, standardize_transcript
+
+    # Train on the text fast_parse sees at runtime
+    text = standardize_transcript(clean_transcript(transcript))
+    return text, {name: play.get(name) or NONE_LABEL for name in FIELDS}
+
+
+def load_examples(paths: Iterable[str]) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Labeled transcripts from archives: saved games (gamestate.json, plays with
+    raw_transcript), recorded LLM responses (benchmark.py --record) and
+    simulator corpora (simulator.py --out).
+    """
+    examples = []
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    examples.append(_example(record["transcript"], record["play"]))
+            continue
+        with open(path) as f:
+            data = json.load(f)
+        if "history" in data:
+            examples.extend(_example(p["raw_transcript"], p) for p in data["history"] if p.get("raw_transcript"))
+        else:
+            for transcript, response in data.items():
+                try:
+                    examples.append(_example(transcript, json.loads(response)))
+                except (json.JSONDecodeError, AttributeError):
+                    continue  # responses that didn't parse
+    return examples
+
+
+def simulated_examples(n_plays: int, seed: int) -> List[Tuple[str, Dict[str, str]]]:
+    from simulator import GameSimulator
+
+    return [
+        _example(item.transcript, item.play.model_dump())
+        for item in GameSimulator(seed).plays(n_plays)
+    ]
+
+
+def evaluate(model: PlayClassifier, examples) -> Dict[str, float]:
+    """Per-field accuracy, keyword-rule accuracy for comparison, and prediction latency."""
+    from fix_hit_info import classify_transcript
+
+    hits = {name: 0 for name in FIELDS}
+    rule_hits = {name: 0 for name in FIELDS}
+    latencies = []
+    for text, labels in examples:
+        start = time.perf_counter()
+        predicted = model.predict(text)
+        latencies.append(time.perf_counter() - start)
+        rules = classify_transcript(text)
+        for name in FIELDS:
+            hits[name] += (predicted[name][0] or NONE_LABEL) == labels[name]
+            rule_hits[name] += (getattr(rules, name) or NONE_LABEL) == labels[name]
+    n = len(examples) or 1
+    latencies_us = np.array(latencies or [0.0]) * 1e6
+    report = {"examples": len(examples)}
+    for name in FIELDS:
+        report[f"{name}_accuracy"] = hits[name] / n
+        report[f"{name}_rules_accuracy"] = rule_hits[name] / n
+    report["p50_us"] = float(np.percentile(latencies_us, 50))
+    report["p95_us"] = float(np.percentile(latencies_us, 95))
+    return report
+
+
+def print_report(report: Dict[str, float]):
+    print(f"{report['examples']} held-out transcripts")
+    print(f"{'field':<14} {'classifier':>10} {'rules':>8}")
+    for name in FIELDS:
+        print(f"{name:<14} {report[f'{name}_accuracy']:>10.1%} {report[f'{name}_rules_accuracy']:>8.1%}")
+    print(f"latency: p50 {report['p50_us']:.0f} us, p95 {report['p95_us']:.0f} us per transcript")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Train and evaluate the play classifier")
+    arg_parser.add_argument("--plays", type=int, default=20000, help="Simulated plays to train on (0 for none)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument(
+        "--archives", nargs="*", default=[],
+        help="Saved games, recorded LLM responses or simulator corpora to train on",
+    )
+    arg_parser.add_argument("--holdout", type=float, default=0.2, help="Share of examples kept for evaluation")
+    arg_parser.add_argument("--epochs", type=int, default=5)
+    arg_parser.add_argument("--out", default=config.PLAY_CLASSIFIER or "play_classifier.npz")
+    arg_parser.add_argument("--evaluate", action="store_true", help="Only evaluate the model at --out on all examples")
+    args = arg_parser.parse_args()
+
+    examples = load_examples(args.archives)
+    if args.plays:
+        examples += simulated_examples(args.plays, args.seed)
+    if not examples:
+        raise SystemExit("No training examples")
+
+    if args.evaluate:
+        print_report(evaluate(PlayClassifier.load(args.out), examples))
+    else:
+        order = np.random.default_rng(args.seed).permutation(len(examples))
+        n_test = int(len(examples) * args.holdout)
+        test = [examples[i] for i in order[:n_test]]
+        train = [examples[i] for i in order[n_test:]]
+
+        start = time.perf_counter()
+        model = PlayClassifier.fit(
+            [text for text, _labels in train],
+            {name: [labels[name] for _text, labels in train] for name in FIELDS},
+            epochs=args.epochs,
+            seed=args.seed,
+        )
+        print(f"Trained on {len(train)} transcripts in {time.perf_counter() - start:.1f}s")
+        model.save(args.out)
+        print(f"Saved {args.out}")
+        print_report(evaluate(model, test))
@@ -0,0 +1,125 @@
+# replay.py - Bulk replay of recorded plays for re-scoring archived games
+import argparse
+import glob
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from batch_validate import encode_plays, validate_batch
+from gamestate import GameState
+from schema import Play
+
+
+def load_plays(path: str) -> List[Play]:
+    """
+    Load a play sequence from:
+        - a GameState.to_json file (plays under "history")
+        - a JSON list of plays
+        - a journal: .jsonl file with one Play JSON object per line
+    """
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            return [Play.model_validate_json(line) for line in f if line.strip()]
+        data = json.load(f)
+
+    if isinstance(data, dict):
+        data = data.get("history", [])
+    return [Play.model_validate(pd) for pd in data]
+
+
+def load_teams(path: str) -> Tuple[str, str]:
+    """Home and away team names saved with a game, or the GameState defaults."""
+    if not path.endswith(".jsonl"):
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict) and "home" in data:
+            return data["home"]["name"], data["away"]["name"]
+    return "HOME", "AWAY"
+
+
+def write_journal(path: str, plays: Iterable[Play]):
+    """Write plays as a journal, one JSON object per line."""
+    with open(path, "w") as f:
+        for play in plays:
+            f.write(play.model_dump_json() + "\n")
+
+
+def validate_plays(plays: List[Play]) -> List[Tuple[int, str]]:
+    """Run the state-independent checks over every play. Returns (index, error) pairs."""
+    mask, reasons = validate_batch(encode_plays(plays))
+    return [(int(i), reasons[i]) for i in np.flatnonzero(~mask)]
+
+
+@dataclass
+class ReplayResult:
+    game: GameState
+    # Index and reason of each play that failed validation
+    invalid: List[Tuple[int, str]] = field(default_factory=list)
+    # GameState.state_dict() after each applied play, when requested
+    snapshots: Optional[List[dict]] = None
+
+
+def replay(
+    plays: List[Play],
+    home_team: str = "HOME",
+    away_team: str = "AWAY",
+    snapshots: bool = False,
+    skip_invalid: bool = False,
+) -> ReplayResult:
+    """
+    Apply a whole play sequence to a fresh game.
+
+    Plays are validated once up front instead of per update. Invalid plays raise
+    ValueError, or are left out when skip_invalid is set. Like undo, the replay
+    trusts the recorded outs rather than re-checking them against the running state.
+    """
+    invalid = validate_plays(plays)
+    if invalid and not skip_invalid:
+        index, error = invalid[0]
+        raise ValueError(f"Invalid play at index {index}: {error}")
+    skipped = {index for index, _ in invalid}
+
+    game = GameState(home_team=home_team, away_team=away_team)
+    apply = game.apply_unchecked
+    states = [] if snapshots else None
+    for i, play in enumerate(plays):
+        if i in skipped:
+            continue
+        apply(play)
+        if states is not None:
+            states.append(game.state_dict(include_history=False))
+    game.publish()
+
+    return ReplayResult(game=game, invalid=invalid, snapshots=states)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-score archived games by replaying their plays")
+    arg_parser.add_argument("games", nargs="+", help="Game files or globs (.json or .jsonl journals)")
+    arg_parser.add_argument("--output", help="Directory for the re-scored game JSON files")
+    arg_parser.add_argument("--skip-invalid", action="store_true", help="Leave out invalid plays instead of failing")
+    args = arg_parser.parse_args()
+
+    paths = sorted({p for pattern in args.games for p in glob.glob(pattern)})
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    total_plays = 0
+    start = time.perf_counter()
+    for path in paths:
+        plays = load_plays(path)
+        home, away = load_teams(path)
+        result = replay(plays, home, away, skip_invalid=args.skip_invalid)
+        total_plays += len(plays)
+        for index, error in result.invalid:
+            print(f"{path}: skipped play {index}: {error}")
+        if args.output:
+            name = os.path.splitext(os.path.basename(path))[0] + ".json"
+            result.game.to_json(os.path.join(args.output, name))
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {total_plays} plays from {len(paths)} games in {elapsed:.2f}s")
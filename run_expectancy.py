@@ -0,0 +1,233 @@
+# run_expectancy.py - Run-expectancy (RE24) and win-probability tables over the base-out state
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from base_out import NUM_STATES, TRANSITIONS, decode_state, encode_state, outs_on
+
+# Plate-appearance outcome rates (roughly MLB league average), keyed by base_out table
+DEFAULT_EVENT_RATES = {
+    "batter_out": 0.68,
+    "walk": 0.09,
+    "single": 0.15,
+    "double": 0.045,
+    "triple": 0.005,
+    "home_run": 0.03,
+}
+
+# How archived play types count as plate-appearance outcomes
+PLAY_TYPE_EVENTS = {
+    "single": "single",
+    "double": "double",
+    "triple": "triple",
+    "home_run": "home_run",
+    "walk": "walk",
+    "hit_by_pitch": "walk",
+    "fielder_choice": "fielder_choice",
+    "ground_out": "batter_out",
+    "fly_out": "batter_out",
+    "line_out": "batter_out",
+    "pop_out": "batter_out",
+    "strikeout": "batter_out",
+    "sac_fly": "batter_out",
+    "sac_bunt": "batter_out",
+    "error": "single",
+}
+
+MAX_RUNS = 20  # runs per half-inning tracked by the distribution (the tail is negligible)
+MAX_LEAD = 20  # score differences are clamped to +-MAX_LEAD
+REGULATION_HALVES = 18
+END_OF_HALF = NUM_STATES  # state index used once the third out is made
+
+
+def event_rates_from_plays(plays: Iterable) -> Dict[str, float]:
+    """Plate-appearance outcome rates observed in archived plays (e.g. GameState histories)."""
+    counts = Counter(
+        PLAY_TYPE_EVENTS[play.play_type] for play in plays if play.play_type in PLAY_TYPE_EVENTS
+    )
+    total = sum(counts.values())
+    if not total:
+        raise ValueError("No completed plate appearances in the given plays")
+    return {event: n / total for event, n in counts.items()}
+
+
+@dataclass
+class Situation:
+    """What the tables need to know about a game at one moment."""
+
+    inning: int
+    top: bool
+    state: int  # base_out.encode_state; outs of 3 or more mean the half-inning is over
+    away_score: int
+    home_score: int
+
+
+@dataclass
+class PlayMetrics:
+    re_before: float
+    re_after: float
+    # Change in run expectancy plus runs scored, for the batting team
+    re24: float
+    # Home team win probability before and after the play
+    wp_before: float
+    wp_after: float
+    # Win probability added, for the batting team
+    wpa: float
+
+
+def situation(game) -> Situation:
+    """Current Situation of a GameState, using the announced score."""
+    return Situation(
+        inning=game.inning.number,
+        top=game.inning.top,
+        state=game.base_out_state(),
+        away_score=game.get_away_score(),
+        home_score=game.get_home_score(),
+    )
+
+
+class ExpectancyModel:
+    """
+    Markov chain over the 24 base-out states driven by plate-appearance outcome
+    rates. Builds, once:
+        - runs: distribution of runs scored in the rest of the half-inning per state
+        - run_expectancy: the RE24 matrix (expected runs per state)
+        - win_table: home win probability per (half-inning, state, home lead)
+    so every lookup afterwards is a single array index.
+    """
+
+    def __init__(self, event_rates: Optional[Dict[str, float]] = None):
+        rates = dict(event_rates or DEFAULT_EVENT_RATES)
+        total = sum(rates.values())
+        self.event_rates = {event: rate / total for event, rate in rates.items()}
+        self.runs = self._run_distribution()
+        self.run_expectancy = self.runs @ np.arange(MAX_RUNS + 1)
+        self.win_table = self._win_table()
+
+    def _run_distribution(self) -> np.ndarray:
+        # runs[s, r]: probability of r more runs from state s; END_OF_HALF scores nothing
+        runs = np.zeros((NUM_STATES + 1, MAX_RUNS + 1))
+        runs[END_OF_HALF, 0] = 1.0
+
+        # (probability, next state, runs) for every state and outcome
+        edges = []
+        for state in range(NUM_STATES):
+            mask, outs = decode_state(state)
+            for event, rate in self.event_rates.items():
+                transition = TRANSITIONS[event][mask] or TRANSITIONS["batter_out"][mask]
+                new_outs = outs + outs_on(transition)
+                next_state = END_OF_HALF if new_outs >= 3 else encode_state(transition[0], new_outs)
+                edges.append((state, rate, next_state, transition[1]))
+
+        # Non-out events loop within an out level, so iterate to the fixed point
+        for _ in range(500):
+            updated = np.zeros_like(runs)
+            updated[END_OF_HALF, 0] = 1.0
+            for state, rate, next_state, scored in edges:
+                if scored:
+                    updated[state, scored:] += rate * runs[next_state, : MAX_RUNS + 1 - scored]
+                else:
+                    updated[state] += rate * runs[next_state]
+            converged = np.abs(updated - runs).max() < 1e-12
+            runs = updated
+            if converged:
+                break
+        return runs
+
+    def _win_table(self) -> np.ndarray:
+        leads = np.arange(-MAX_LEAD, MAX_LEAD + 1)
+        start = self.runs[encode_state(0, 0)]
+
+        # Extra innings repeat until one team outscores the other in a full inning
+        away_wins = sum(start[a] * start[:a].sum() for a in range(MAX_RUNS + 1))
+        home_wins = sum(start[h] * start[:h].sum() for h in range(MAX_RUNS + 1))
+        extra = home_wins / (home_wins + away_wins)
+
+        # after[h, lead]: home win probability once half-inning h is over
+        after = np.zeros((REGULATION_HALVES, len(leads)))
+        final = np.where(leads > 0, 1.0, np.where(leads < 0, 0.0, extra))
+        after[REGULATION_HALVES - 1] = final
+
+        table = np.zeros((REGULATION_HALVES, NUM_STATES + 1, len(leads)))
+        for half in range(REGULATION_HALVES - 1, -1, -1):
+            if half < REGULATION_HALVES - 1:
+                after[half] = table[half + 1, encode_state(0, 0)]
+            # Runs by the away team (top halves) lower the home lead
+            sign = -1 if half % 2 == 0 else 1
+            for state in range(NUM_STATES + 1):
+                dist = self.runs[state]
+                shifted = leads[:, None] + sign * np.arange(MAX_RUNS + 1)[None, :]
+                table[half, state] = (
+                    after[half][np.clip(shifted, -MAX_LEAD, MAX_LEAD) + MAX_LEAD] @ dist
+                )
+            if half == REGULATION_HALVES - 1:
+                # Bottom of the ninth isn't played when the home team already leads
+                table[half, :, leads > 0] = 1.0
+        return table
+
+    def expected_runs(self, state: int) -> float:
+        """Expected runs in the rest of the half-inning (0 once it is over)."""
+        return 0.0 if state >= NUM_STATES else float(self.run_expectancy[state])
+
+    def win_probability(self, sit: Situation) -> float:
+        """Home team win probability in a situation."""
+        half = 2 * (min(sit.inning, 9) - 1) + (0 if sit.top else 1)
+        lead = int(np.clip(sit.home_score - sit.away_score, -MAX_LEAD, MAX_LEAD))
+        if sit.state >= NUM_STATES:
+            # Third out made: the next half-inning starts from scratch
+            if half + 1 < REGULATION_HALVES:
+                return float(self.win_table[half + 1, encode_state(0, 0), lead + MAX_LEAD])
+            half, state = REGULATION_HALVES - 1, END_OF_HALF
+        else:
+            state = sit.state
+        return float(self.win_table[half, state, lead + MAX_LEAD])
+
+    def evaluate(self, before: Situation, after: Situation, runs_scored: int) -> PlayMetrics:
+        """RE24 and WPA of one play from the situations around it."""
+        re_before = self.expected_runs(before.state)
+        re_after = self.expected_runs(after.state)
+        wp_before = self.win_probability(before)
+        wp_after = self.win_probability(after)
+        wpa = wp_after - wp_before
+        return PlayMetrics(
+            re_before=re_before,
+            re_after=re_after,
+            re24=re_after - re_before + runs_scored,
+            wp_before=wp_before,
+            wp_after=wp_after,
+            wpa=-wpa if before.top else wpa,
+        )
+
+
+_default_model: Optional[ExpectancyModel] = None
+
+
+def get_model() -> ExpectancyModel:
+    """Model with the default outcome rates, built on first use."""
+    global _default_model
+    if _default_model is None:
+        _default_model = ExpectancyModel()
+    return _default_model
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from replay import load_plays
+
+    arg_parser = argparse.ArgumentParser(description="Print the RE24 matrix")
+    arg_parser.add_argument("games", nargs="*", help="Archived games to fit the outcome rates from")
+    args = arg_parser.parse_args()
+
+    rates = None
+    if args.games:
+        rates = event_rates_from_plays(p for path in args.games for p in load_plays(path))
+    model = ExpectancyModel(rates)
+
+    print(f"{'bases':<8}{'0 out':>8}{'1 out':>8}{'2 out':>8}")
+    for mask in range(8):
+        bases = "".join(str(i + 1) if mask >> i & 1 else "-" for i in range(3))
+        row = "".join(f"{model.expected_runs(encode_state(mask, outs)):>8.3f}" for outs in range(3))
+        print(f"{bases:<8}{row}")
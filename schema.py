@@ -1,5 +1,6 @@
 # schema.py - Pydantic data models for baseball plays
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import List, Optional, Literal
 
 BaseName = Optional[str]
@@ -19,6 +20,26 @@ class RunnerMovement(BaseModel):
     )
 
 
+class WordTiming(BaseModel):
+    """One recognized word and where it falls in the clip (seconds)."""
+
+    word: str
+    start: float
+    end: float
+    probability: Optional[float] = None
+
+
+class TranscriptSegment(BaseModel):
+    """One speech recognizer segment with its timing and scores."""
+
+    start: float
+    end: float
+    text: str
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    words: List[WordTiming] = Field(default_factory=list)
+
+
 class Play(BaseModel):
     """
     A Play represents either:
@@ -134,6 +155,14 @@ class Play(BaseModel):
     )
     outs_after_play: Optional[int] = None
 
+    # Audio alignment, filled in from the transcription rather than by the LLM
+    # (SkipJsonSchema keeps these out of the parser's format instructions)
+    audio_file: SkipJsonSchema[Optional[str]] = None
+    segments: SkipJsonSchema[List[TranscriptSegment]] = Field(default_factory=list)
+    # Wall-clock times (epoch seconds): clip handed to the pipeline, play shown on the scoreboard
+    clip_received_at: SkipJsonSchema[Optional[float]] = None
+    displayed_at: SkipJsonSchema[Optional[float]] = None
+
     ''' Example Plays for API Endpoint
     class Config:
         """Pydantic configuration with examples"""
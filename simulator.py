@@ -0,0 +1,390 @@
+# simulator.py - Monte Carlo game simulator for load tests and reproducible benchmark corpora
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from base_out import BASE_NAMES, BATTER, HOME, OUT, TRANSITIONS, apply_moves, end_name, mask_of
+from schema import Play, RunnerMovement
+
+HOME_LINEUP = ["Ohtani", "Freddy", "Will", "Max", "Teoscar", "Tommy", "Kiké", "Gavin", "Miguel"]
+AWAY_LINEUP = ["Bo", "Addison", "Neil", "Marcus", "Daulton", "George", "Vlad", "Alejandro", "Ernie"]
+
+# Per-pitch outcomes and their probabilities
+PITCHES = ["ball", "called_strike", "swinging_strike", "foul", "in_play", "hit_by_pitch"]
+PITCH_PROBS = [0.36, 0.17, 0.11, 0.18, 0.177, 0.003]
+
+# Ball-in-play outcomes and their probabilities
+IN_PLAY = ["out", "single", "double", "triple", "home_run"]
+IN_PLAY_PROBS = [0.66, 0.23, 0.07, 0.008, 0.032]
+
+# Batted-ball type per out kind, and the announcement phrases
+OUT_KINDS = [
+    ("ground_out", "grounds out", "ground_ball", "ground ball"),
+    ("fly_out", "flies out", "fly_ball", "fly ball"),
+    ("line_out", "lines out", "line_drive", "line drive"),
+    ("pop_out", "pops out", "popup", "popup"),
+]
+HIT_KINDS = [("ground_ball", "ground ball"), ("fly_ball", "fly ball"), ("line_drive", "line drive")]
+DIRECTIONS = [
+    ("ss", "shortstop"),
+    ("2b", "second base"),
+    ("3b", "third base"),
+    ("1b", "first base"),
+    ("lf", "left field"),
+    ("cf", "center field"),
+    ("rf", "right field"),
+]
+HIT_VERBS = {"single": "hits a single", "double": "hits a double", "triple": "hits a triple", "home_run": "hits a home run"}
+PITCH_VERBS = {
+    "ball": "takes a ball",
+    "called_strike": "takes a called strike",
+    "swinging_strike": "swings and misses",
+    "foul": "fouls it off",
+}
+
+# Chance that a ground ball out with a runner on first and under two outs is
+# turned into a double play, or into a fielder's choice force out
+DOUBLE_PLAY_RATE = 0.35
+FIELDERS_CHOICE_RATE = 0.2
+
+NUMBER_WORDS = {0: "No outs", 1: "1 out", 2: "2 out", 3: "3 out"}
+
+
+@dataclass
+class SimulatedPlay:
+    game: int
+    inning: int
+    top: bool
+    play: Play
+    transcript: str
+
+
+class _Draws:
+    """Pre-drawn random numbers, refilled in large vectorized chunks."""
+
+    def __init__(self, rng: np.random.Generator, chunk_size: int):
+        self.rng = rng
+        self.chunk_size = chunk_size
+        self.pos = chunk_size
+
+    def _refill(self):
+        n = self.chunk_size
+        self.pitch = self.rng.choice(len(PITCHES), size=n, p=PITCH_PROBS).tolist()
+        self.in_play = self.rng.choice(len(IN_PLAY), size=n, p=IN_PLAY_PROBS).tolist()
+        self.kind = self.rng.integers(0, len(OUT_KINDS), size=n).tolist()
+        self.direction = self.rng.integers(0, len(DIRECTIONS), size=n).tolist()
+        self.uniform = self.rng.random(size=n).tolist()
+        self.pos = 0
+
+    def next(self) -> int:
+        if self.pos >= self.chunk_size:
+            self._refill()
+        self.pos += 1
+        return self.pos - 1
+
+
+def _bases_phrase(slots: List[Optional[str]]) -> str:
+    runners = [f"Runner on {BASE_NAMES[i]}: {name}" for i, name in enumerate(slots) if name]
+    return ", ".join(runners) if runners else "Bases empty"
+
+
+class GameSimulator:
+    """
+    Generates whole games as schema.Play sequences with matching transcripts in
+    the announcement format parse_play expects:
+        "[Batter] [Action]. Count: [Balls]-[Strikes]. [Base State]. [Outs]. Score: [Away]-[Home]."
+    All randomness is drawn in vectorized chunks from one seeded generator, so
+    the same seed always yields the same corpus.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        home_lineup: Optional[List[str]] = None,
+        away_lineup: Optional[List[str]] = None,
+        chunk_size: int = 65536,
+    ):
+        self.draws = _Draws(np.random.default_rng(seed), chunk_size)
+        self.lineups = {True: away_lineup or AWAY_LINEUP, False: home_lineup or HOME_LINEUP}
+
+    def plays(self, n_plays: int) -> Iterator[SimulatedPlay]:
+        """Yield n_plays plays, starting a new game whenever one ends."""
+        produced = 0
+        game = 0
+        while produced < n_plays:
+            for play in self.game(game):
+                yield play
+                produced += 1
+                if produced >= n_plays:
+                    return
+            game += 1
+
+    def game(self, game_index: int = 0) -> Iterator[SimulatedPlay]:
+        """Yield the plays of one nine-inning (or longer) game."""
+        d = self.draws
+        score = {True: 0, False: 0}  # keyed by "top": away bats in the top half
+        order = {True: 0, False: 0}
+        inning, top = 1, True
+
+        while True:
+            outs = 0
+            slots: List[Optional[str]] = [None, None, None]
+            while outs < 3:
+                lineup = self.lineups[top]
+                batter = lineup[order[top] % len(lineup)]
+                order[top] += 1
+                balls = strikes = 0
+
+                while True:
+                    i = d.next()
+                    pitch = PITCHES[d.pitch[i]]
+
+                    if pitch in PITCH_VERBS:
+                        if pitch == "ball":
+                            balls += 1
+                        elif pitch != "foul" or strikes < 2:
+                            strikes += 1
+
+                        if balls == 4:
+                            event = "walk"
+                        elif strikes == 3:
+                            event = "strikeout"
+                        else:
+                            yield self._pitch(
+                                (game_index, inning, top), pitch, batter, balls, strikes, slots, outs, score
+                            )
+                            continue
+                    elif pitch == "hit_by_pitch":
+                        event = "hit_by_pitch"
+                    else:
+                        event = IN_PLAY[d.in_play[i]]
+
+                    play, slots, outs = self._at_bat_result(event, i, batter, slots, outs, score, top)
+                    yield SimulatedPlay(game_index, inning, top, play, play.raw_transcript)
+                    break
+
+                # Walk-off: the bottom of the ninth or later ends once the home team leads
+                if not top and inning >= 9 and score[False] > score[True]:
+                    return
+
+            if inning >= 9 and (
+                (top and score[False] > score[True]) or (not top and score[False] != score[True])
+            ):
+                return
+            if not top:
+                inning += 1
+            top = not top
+
+    def _pitch(self, where, pitch, batter, balls, strikes, slots, outs, score) -> SimulatedPlay:
+        transcript = (
+            f"{batter} {PITCH_VERBS[pitch]}. Count: {balls}-{strikes}. {_bases_phrase(slots)}. "
+            f"{NUMBER_WORDS[outs]}. Score: {score[True]}-{score[False]}."
+        )
+        play = Play.model_construct(
+            play_type=pitch,
+            batter=batter,
+            balls=balls,
+            strikes=strikes,
+            runners=[],
+            segments=[],
+            outs_after_play=outs,
+            away_score_snapshot=score[True],
+            home_score_snapshot=score[False],
+            raw_transcript=transcript,
+        )
+        return SimulatedPlay(*where, play, transcript)
+
+    def _at_bat_result(self, event, i, batter, slots, outs, score, top):
+        """Build the Play and transcript of an at-bat ending event; returns (play, slots, outs)."""
+        d = self.draws
+        mask = mask_of(slots)
+        hit_type = direction = None
+        direction_phrase = ""
+        play_type = event
+
+        if event == "out":
+            play_type, verb, hit_type, kind_phrase = OUT_KINDS[d.kind[i]]
+            direction, where = DIRECTIONS[d.direction[i]]
+            direction_phrase = f" on a {kind_phrase} to {where}"
+            moves = TRANSITIONS["batter_out"][mask][2]
+            if play_type == "ground_out" and mask & 1 and outs < 2:
+                if d.uniform[i] < DOUBLE_PLAY_RATE:
+                    play_type, verb = "double_play", "grounds into a double play"
+                    moves = ((0, OUT), (BATTER, OUT))
+                elif d.uniform[i] < DOUBLE_PLAY_RATE + FIELDERS_CHOICE_RATE:
+                    play_type, verb = "fielder_choice", "reaches on a fielder's choice"
+                    moves = TRANSITIONS["fielder_choice"][mask][2]
+        elif event in HIT_VERBS:
+            verb = HIT_VERBS[event]
+            hit_type, kind_phrase = HIT_KINDS[d.kind[i] % len(HIT_KINDS)]
+            direction, where = DIRECTIONS[4 + d.direction[i] % 3] if event != "single" else DIRECTIONS[d.direction[i]]
+            direction_phrase = f" on a {kind_phrase} to {where}" if event != "home_run" else f" to {where}"
+            moves = TRANSITIONS[event][mask][2]
+        elif event == "strikeout":
+            verb = "strikes out"
+            moves = TRANSITIONS["batter_out"][mask][2]
+        elif event == "walk":
+            verb = "draws a walk"
+            moves = TRANSITIONS["walk"][mask][2]
+        else:  # hit_by_pitch
+            verb = "is hit by pitch"
+            moves = TRANSITIONS["hit_by_pitch"][mask][2]
+
+        runners = [
+            RunnerMovement.model_construct(
+                player=batter if start == BATTER else slots[start],
+                start_base="none" if start == BATTER else BASE_NAMES[start],
+                end_base=end_name(end),
+            )
+            for start, end in moves
+        ]
+        outs_made = sum(1 for _s, end in moves if end == OUT)
+        runs = sum(1 for _s, end in moves if end == HOME)
+        if outs + outs_made >= 3:
+            runs = 0  # no run counts on the inning-ending out in this simplified model
+        new_outs = min(outs + outs_made, 3)
+        new_slots = apply_moves(slots, moves, batter) if new_outs < 3 else [None, None, None]
+        score[top] += runs
+
+        movement_phrase = "".join(
+            f", {r.player} to {r.end_base}" for r in runners if r.end_base not in ("out", "none")
+        )
+        transcript = (
+            f"{batter} {verb}{direction_phrase}{movement_phrase}. {_bases_phrase(new_slots)}. "
+            f"{NUMBER_WORDS[new_outs]}. Score: {score[True]}-{score[False]}."
+        )
+        play = Play.model_construct(
+            play_type=play_type,
+            batter=batter,
+            hit_type=hit_type,
+            hit_direction=direction,
+            runners=runners,
+            segments=[],
+            outs_made=outs_made,
+            runs_scored=runs,
+            at_bat_complete=True,
+            outs_after_play=new_outs,
+            away_score_snapshot=score[True],
+            home_score_snapshot=score[False],
+            raw_transcript=transcript,
+        )
+        return play, new_slots, new_outs
+
+
+def stress(n_plays: int, seed: int = 0, undo_every: int = 200) -> Dict[str, float]:
+    """
+    Drive GameState with simulated games: normalize every transcript, apply
+    every play, undo and re-apply every undo_every plays, and round-trip each
+    session through to_json/from_json. Returns seconds spent per operation.
+
+    Like the app, GameState is run half-inning by half-inning: every half-inning
+    is a fresh session, since undo replays history without changing sides.
+    """
+    from gamestate import GameState
+    from speech import clean_transcript, standardize_transcript
+
+    timings = {"generate": 0.0, "normalize": 0.0, "update": 0.0, "undo": 0.0, "serialize": 0.0}
+    counts = {"plays": 0, "sessions": 0, "undos": 0}
+
+    def finish(game):
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "game.json")
+            game.to_json(path)
+            restored = GameState.from_json(path)
+        if len(restored.history) != len(game.history):
+            raise AssertionError("History lost in JSON round trip")
+        timings["serialize"] += time.perf_counter() - start
+        counts["sessions"] += 1
+
+    game = None
+    current = None
+    plays = GameSimulator(seed).plays(n_plays)
+    while True:
+        start = time.perf_counter()
+        item = next(plays, None)
+        timings["generate"] += time.perf_counter() - start
+        if item is None:
+            break
+
+        if (item.game, item.inning, item.top) != current:
+            if game is not None:
+                finish(game)
+            game = GameState(home_team="HOME", away_team="AWAY")
+            game.inning.number, game.inning.top = item.inning, item.top
+            current = (item.game, item.inning, item.top)
+
+        start = time.perf_counter()
+        standardize_transcript(clean_transcript(item.transcript))
+        timings["normalize"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        game.update(item.play)
+        timings["update"] += time.perf_counter() - start
+        counts["plays"] += 1
+
+        if undo_every and counts["plays"] % undo_every == 0:
+            start = time.perf_counter()
+            game.undo_last_play()
+            game.update(item.play)
+            timings["undo"] += time.perf_counter() - start
+            counts["undos"] += 1
+
+    if game is not None:
+        finish(game)
+    return {**timings, **counts}
+
+
+def write_corpus(path: str, n_plays: int, seed: int = 0):
+    """Write a reproducible JSON lines corpus: game index, transcript and Play per line."""
+    with open(path, "w") as f:
+        for item in GameSimulator(seed).plays(n_plays):
+            record = {
+                "game": item.game,
+                "inning": item.inning,
+                "top": item.top,
+                "transcript": item.transcript,
+                "play": item.play.model_dump(exclude_none=True),
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def load_corpus(path: str) -> Iterator[SimulatedPlay]:
+    """Read back a corpus written by write_corpus."""
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            yield SimulatedPlay(
+                record["game"],
+                record["inning"],
+                record["top"],
+                Play.model_validate(record["play"]),
+                record["transcript"],
+            )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Simulate games for load tests and benchmark corpora")
+    arg_parser.add_argument("--plays", type=int, default=10000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--out", help="Write a JSON lines corpus here instead of running the stress test")
+    arg_parser.add_argument("--undo-every", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    if args.out:
+        write_corpus(args.out, args.plays, args.seed)
+        print(f"Wrote {args.plays} plays to {args.out}")
+    else:
+        results = stress(args.plays, args.seed, args.undo_every)
+        for name in ("generate", "normalize", "update", "undo", "serialize"):
+            print(f"{name:<10} {results[name]:>8.2f}s")
+        print(
+            f"{results['plays']} plays, {results['sessions']} half-innings, {results['undos']} undos, "
+            f"{results['plays'] / results['update']:.0f} updates/sec"
+        )
@@ -0,0 +1,123 @@
+# speculative.py - Speculative fast-path parsing of partial transcripts during capture
+#
+# main.py hands over finished clip files, so capture is only simulated here: the
+# partial passes run back to back on growing prefixes of the clip, and Whisper
+# pads each one to its 30 s window. In file mode speculation therefore adds
+# latency (the final play arrives after all the partial passes); it only pays
+# off with audio that really arrives in chunks.
+from typing import Callable, Iterator, Optional, Tuple
+
+from parse_play import fast_parse
+from schema import Play
+from speech import (
+    SAMPLE_RATE,
+    SpeechBackend,
+    Transcription,
+    cached_transcription,
+    clean_transcript,
+    get_backend,
+    standardize_transcript,
+    transcribe_decoded,
+)
+from tracing import span
+
+
+def stream_hypotheses(backend: SpeechBackend, audio, step_seconds: float) -> Iterator[Transcription]:
+    """
+    Partial hypotheses as the utterance grows: the audio received so far is
+    transcribed every step_seconds, up to but not including the full utterance.
+    """
+    step = max(int(step_seconds * SAMPLE_RATE), 1)
+    for end in range(step, len(audio), step):
+        with span("transcribe_partial"):
+            yield backend.transcribe_array(audio[:end])
+
+
+def _key(play: Play) -> Tuple:
+    # Outs and score come last in an announcement, so they don't take part
+    return (play.play_type, play.batter, play.balls, play.strikes)
+
+
+# Fields a committed speculative play takes from the final transcript's parse
+LATE_FIELDS = ("outs_after_play", "away_score_snapshot", "home_score_snapshot", "raw_transcript", "confidence")
+
+
+class SpeculativeParser:
+    """
+    Runs fast_parse on partial hypotheses. Once the same result comes back from
+    stable_hypotheses consecutive hypotheses, the play is prepared speculatively
+    and previewed. finish() commits it when the final transcript parses to the
+    same pitch call and count, and discards it otherwise.
+    """
+
+    def __init__(self, game, stable_hypotheses: int = 2):
+        self.game = game
+        self.stable_hypotheses = stable_hypotheses
+        self.speculative: Optional[Play] = None
+        self._last_key = None
+        self._repeats = 0
+        self.hits = 0
+        self.discards = 0
+
+    def feed(self, hypothesis: str) -> Optional[str]:
+        """Take a partial hypothesis; returns the preview text when a play is first speculated."""
+        if self.speculative is not None:
+            return None
+        play = fast_parse(standardize_transcript(clean_transcript(hypothesis)))
+        if play is None:
+            self._last_key, self._repeats = None, 0
+            return None
+
+        key = _key(play)
+        self._repeats = self._repeats + 1 if key == self._last_key else 1
+        self._last_key = key
+        if self._repeats < self.stable_hypotheses:
+            return None
+
+        self.speculative = play
+        return self.game.preview_play(play)
+
+    def finish(self, transcript: str) -> Optional[Play]:
+        """
+        Resolve the speculation against the final (cleaned) transcript. Returns
+        the speculative play, updated with LATE_FIELDS, when the final parse
+        agrees with it; otherwise the final fast-path play, or None when the
+        full parser is needed.
+        """
+        final = fast_parse(transcript)
+        speculative, self.speculative = self.speculative, None
+        self._last_key, self._repeats = None, 0
+        if speculative is None:
+            return final
+        if final is not None and _key(final) == _key(speculative):
+            # Committed, with the outs and score the full announcement adds
+            self.hits += 1
+            return speculative.model_copy(update={name: getattr(final, name) for name in LATE_FIELDS})
+        self.discards += 1
+        return final
+
+
+def transcribe_speculatively(
+    file_path: str,
+    parser: SpeculativeParser,
+    on_preview: Callable[[str], None],
+    step_seconds: float,
+) -> Transcription:
+    """
+    Transcribe a clip as if it were arriving live, feeding each partial
+    hypothesis to the parser and reporting previews as soon as they are ready.
+    Returns the final transcription, which goes through the transcription cache;
+    a cached clip skips the partial passes. Call parser.finish() with its cleaned text.
+    """
+    backend = get_backend()
+    with span("audio_decode"):
+        audio = backend.decode(file_path)
+
+    cached, _key = cached_transcription(audio, backend)
+    if cached is not None:
+        return cached
+    for partial in stream_hypotheses(backend, audio, step_seconds):
+        preview = parser.feed(partial.text)
+        if preview is not None:
+            on_preview(preview)
+    return transcribe_decoded(audio, backend)
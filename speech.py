@@ -1,24 +1,340 @@
-import whisper
+import logging
+import os
 import re
+import subprocess
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
+import config
+from schema import Play, TranscriptSegment
+from tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+PROMPT = "This audio is live baseball play-by-play commentary. The speaker quickly describes each pitch, swing, hit, and play using common baseball terms and abbreviations. "
 
-# Load model
-def transcribe_audio(file_path: str) -> str:
-    model = whisper.load_model("base")
- 
-    prompt = "This audio is live baseball play-by-play commentary. The speaker quickly describes each pitch, swing, hit, and play using common baseball terms and abbreviations. "
-    
-    result = model.transcribe(file_path, fp16=False, initial_prompt=prompt)
 
+@dataclass
+class Transcription:
+    """Text and per-segment details returned by every speech backend."""
+
+    text: str
+    segments: List[dict] = field(default_factory=list)
+
+
+class SpeechBackend:
     """
-    Write each "Chunked text into a txt file for parsing"
+    Base class for speech-to-text engines.
+    Subclasses load their model in load() and transcribe decoded audio in transcribe_array().
     """
-    parse = result["text"]
 
+    name = "base"
+
+    def __init__(self, model_size: str = "base"):
+        self.model_size = model_size
+        self.model = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def decode(self, file_path: str):
+        """Decode any ffmpeg-readable file to 16 kHz mono float32 PCM (as whisper does)."""
+        import numpy as np
+
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", file_path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-",
+        ]
+        try:
+            out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio {file_path}: {e.stderr.decode()}") from e
+        return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+    def transcribe_array(self, audio) -> Transcription:
+        raise NotImplementedError
+
+    def transcribe(self, file_path: str) -> Transcription:
+        with span("audio_decode"):
+            audio = self.decode(file_path)
+        with span("transcribe"):
+            return self.transcribe_array(audio)
+
+
+class WhisperBackend(SpeechBackend):
+    """Reference openai-whisper backend (PyTorch, fp32 on CPU)."""
+
+    name = "whisper"
+
+    def load(self):
+        import torch
+        import whisper
+
+        if config.SPEECH_THREADS:
+            torch.set_num_threads(config.SPEECH_THREADS)
+        if config.SPEECH_INTEROP_THREADS:
+            try:
+                torch.set_num_interop_threads(config.SPEECH_INTEROP_THREADS)
+            except RuntimeError as e:
+                # Can only be set once per process, before any inter-op work
+                logger.warning("SARG_SPEECH_INTEROP_THREADS not applied: %s", e)
+        self.model = whisper.load_model(self.model_size)
+
+    def transcribe_array(self, audio) -> Transcription:
+        result = self.model.transcribe(
+            audio,
+            fp16=False,
+            initial_prompt=PROMPT,
+            word_timestamps=config.SPEECH_WORD_TIMESTAMPS,
+        )
+        segments = [
+            {
+                "start": s["start"],
+                "end": s["end"],
+                "text": s["text"],
+                "avg_logprob": s.get("avg_logprob"),
+                "no_speech_prob": s.get("no_speech_prob"),
+                "words": [
+                    {"word": w["word"], "start": w["start"], "end": w["end"], "probability": w.get("probability")}
+                    for w in s.get("words", [])
+                ],
+            }
+            for s in result.get("segments", [])
+        ]
+        return Transcription(text=result["text"], segments=segments)
+
+
+class FasterWhisperBackend(SpeechBackend):
+    """CTranslate2 backend (faster-whisper), int8-quantized on CPU by default."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = "base", compute_type: str = "int8", device: str = "cpu"):
+        super().__init__(model_size)
+        self.compute_type = compute_type
+        self.device = device
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_size,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=config.SPEECH_THREADS,
+        )
+
+    def transcribe_array(self, audio) -> Transcription:
+        segments, _info = self.model.transcribe(
+            audio, initial_prompt=PROMPT, word_timestamps=config.SPEECH_WORD_TIMESTAMPS
+        )
+        # faster-whisper decodes lazily, consuming the generator runs the model
+        segments = [
+            {
+                "start": s.start,
+                "end": s.end,
+                "text": s.text,
+                "avg_logprob": s.avg_logprob,
+                "no_speech_prob": s.no_speech_prob,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in s.words or []
+                ],
+            }
+            for s in segments
+        ]
+        return Transcription(text="".join(s["text"] for s in segments), segments=segments)
+
+
+class WhisperCppBackend(SpeechBackend):
+    """whisper.cpp backend through the pywhispercpp bindings (ggml, quantized models)."""
+
+    name = "whisper-cpp"
+
+    def load(self):
+        from pywhispercpp.model import Model
+
+        params = {"n_threads": config.SPEECH_THREADS} if config.SPEECH_THREADS else {}
+        self.model = Model(self.model_size, print_progress=False, **params)
+
+    def transcribe_array(self, audio) -> Transcription:
+        # whisper.cpp reports timestamps in centiseconds (and no word timings here)
+        segments = [
+            {"start": s.t0 / 100.0, "end": s.t1 / 100.0, "text": s.text}
+            for s in self.model.transcribe(audio, initial_prompt=PROMPT)
+        ]
+        return Transcription(text="".join(s["text"] for s in segments), segments=segments)
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    WhisperCppBackend.name: WhisperCppBackend,
+}
+
+def parse_cpu_list(spec: str) -> List[int]:
+    """CPU ids from a list such as "0-3,8,10-11"."""
+    cpus = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def pin_cpus(spec: str):
+    """
+    Restrict the calling thread to the given cores for good (Linux only).
+    Threads it starts afterwards inherit the mask, so this is only for
+    processes that do nothing but speech (speech_pool and thread_sweep workers).
+    """
+    cpus = parse_cpu_list(spec)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+@contextmanager
+def speech_cpus(spec: str):
+    """
+    Pin the calling thread to the given cores for the with-block, then restore
+    its previous mask. Threads started inside, such as torch's intra-op pool
+    when the model loads, keep the pinned mask.
+    """
+    cpus = parse_cpu_list(spec)
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+# Loaded backends, keyed by (name, model_size, compute_type), so each model loads once
+_loaded: Dict[Tuple[str, str, Optional[str]], SpeechBackend] = {}
+
+
+def get_backend(
+    name: Optional[str] = None,
+    model_size: Optional[str] = None,
+    compute_type: Optional[str] = None,
+) -> SpeechBackend:
+    """Return a loaded speech backend, defaulting to the values in config.py."""
+    name = name or config.SPEECH_BACKEND
+    model_size = model_size or config.SPEECH_MODEL
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown speech backend: {name} (choose from {', '.join(BACKENDS)})"
+        )
+    if name == FasterWhisperBackend.name:
+        compute_type = compute_type or config.SPEECH_COMPUTE_TYPE
+    else:
+        compute_type = None
+
+    key = (name, model_size, compute_type)
+    if key not in _loaded:
+        if compute_type is not None:
+            backend = BACKENDS[name](
+                model_size, compute_type=compute_type, device=config.SPEECH_DEVICE
+            )
+        else:
+            backend = BACKENDS[name](model_size)
+        with speech_cpus(config.SPEECH_CPUS), span("model_load"):
+            backend.load()
+        _loaded[key] = backend
+    return _loaded[key]
+
+
+def transcribe_with_details(file_path: str) -> Transcription:
     """
-    Parse from input in game_transcript.txt to intermed language
+    Transcribe an audio file with the configured backend, keeping per-segment
+    scores. Audio transcribed before by the same model comes from the cache.
     """
-    return result["text"]
+    backend = get_backend()
+    with span("audio_decode"):
+        audio = backend.decode(file_path)
+    return transcribe_decoded(audio, backend)
+
+
+def cached_transcription(audio, backend: SpeechBackend) -> Tuple[Optional[Transcription], Optional[str]]:
+    """The cached transcription of decoded audio (None if there is none) and its cache key (None without a cache)."""
+    from transcription_cache import get_cache
+
+    cache = get_cache()
+    if cache is None:
+        return None, None
+    model_id = f"{backend.name}:{backend.model_size}:{getattr(backend, 'compute_type', '')}"
+    key = cache.key(audio, model_id, options=f"{SAMPLE_RATE}:{config.SPEECH_WORD_TIMESTAMPS}:{PROMPT}")
+    entry = cache.get(key)
+    if entry is None:
+        return None, key
+    return Transcription(text=entry["text"], segments=entry["segments"]), key
+
+
+def transcribe_decoded(audio, backend: Optional[SpeechBackend] = None) -> Transcription:
+    """Transcribe decoded audio, through the transcription cache when one is configured."""
+    from transcription_cache import get_cache
+
+    backend = backend or get_backend()
+    transcription, key = cached_transcription(audio, backend)
+    if transcription is not None:
+        return transcription
+    with span("transcribe"):
+        transcription = backend.transcribe_array(audio)
+    if key is not None:
+        get_cache().put(key, {"text": transcription.text, "segments": transcription.segments})
+    return transcription
+
+
+def retranscribe_segment(file_path: str, start: float, end: float) -> Transcription:
+    """
+    Transcribe only start-end (seconds) of a clip, e.g. the segment a correction
+    touches. Segment and word times are shifted back to clip time.
+    """
+    backend = get_backend()
+    with span("audio_decode"):
+        audio = backend.decode(file_path)
+    with span("transcribe"):
+        result = backend.transcribe_array(audio[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)])
+    for segment in result.segments:
+        segment["start"] += start
+        segment["end"] += start
+        for word in segment.get("words", []):
+            word["start"] += start
+            word["end"] += start
+    return result
+
+
+def attach_transcription(play: Play, transcription: Transcription, file_path: Optional[str] = None) -> Play:
+    """Store the clip and its timed segments on the play parsed from it."""
+    play.audio_file = file_path
+    play.segments = [TranscriptSegment(**s) for s in transcription.segments]
+    return play
+
+
+def replace_segment(play: Play, index: int, transcription: Transcription) -> str:
+    """
+    Swap segment index of a play for a re-transcription of the same span
+    (see retranscribe_segment) and return the play's updated full text.
+    """
+    new_segments = [TranscriptSegment(**s) for s in transcription.segments]
+    play.segments[index : index + 1] = new_segments
+    return "".join(s.text for s in play.segments).strip()
+
+
+def transcribe_audio(file_path: str) -> str:
+    """Transcribe an audio file with the configured backend and return its text."""
+    return transcribe_with_details(file_path).text
 
 
 # For now, this is just for assistance when testing with specific teams
@@ -67,12 +383,14 @@ COMMON_MISTAKES = {
     
 }
 
+@traced("clean_transcript")
 def clean_transcript(text):
     """Replace common transcription mistakes."""
     for wrong, right in COMMON_MISTAKES.items():
         text = text.replace(wrong, right)
     return text
 
+@traced("standardize_transcript")
 def standardize_transcript(text: str) -> str:
     """
     Standardize messy Whisper transcripts to match the expected format:
@@ -0,0 +1,197 @@
+# speech_pool.py - Multiprocess speech workers with warm models and shared-memory audio handoff
+import argparse
+import glob
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+import config
+from speech import SpeechBackend, Transcription, get_backend, pin_cpus
+
+READY = "ready"
+
+
+def _worker(tasks, results, name, model_size, compute_type):
+    """Load the backend once, then transcribe audio handed over in shared memory until a None task."""
+    # The worker process only does speech, so all of it stays on the speech cores
+    pin_cpus(config.SPEECH_CPUS)
+    try:
+        backend = get_backend(name, model_size, compute_type)
+    except Exception as e:
+        results.put((READY, None, f"{type(e).__name__}: {e}"))
+        return
+    results.put((READY, None, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        task_id, shm_name, n_samples = task
+        # Spawned workers share the parent's resource tracker, so attaching here
+        # doesn't schedule a second unlink
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                # A view on the parent's buffer: nothing is pickled or copied
+                audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf)
+                result = (task_id, backend.transcribe_array(audio), None)
+            finally:
+                # The view must go before close(), or it raises BufferError
+                audio = None
+                shm.close()
+        except Exception as e:
+            result = (task_id, None, f"{type(e).__name__}: {e}")
+        results.put(result)
+
+
+class SpeechPool:
+    """
+    N worker processes, each holding a loaded speech backend. Audio is copied
+    once into a shared-memory block per clip; workers read it in place.
+    Results are returned in submission order.
+
+        with SpeechPool(workers=8) as pool:
+            for transcription in pool.map(clips):
+                ...
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        name: Optional[str] = None,
+        model_size: Optional[str] = None,
+        compute_type: Optional[str] = None,
+    ):
+        self.workers = workers or mp.cpu_count()
+        # spawn: torch and CTranslate2 don't survive fork with their thread pools
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._processes = [
+            ctx.Process(
+                target=_worker,
+                args=(self._tasks, self._results, name, model_size, compute_type),
+                daemon=True,
+            )
+            for _ in range(self.workers)
+        ]
+        self._blocks: Dict[int, shared_memory.SharedMemory] = {}
+        # Finished tasks not yet returned: the transcription, or the error for a failed one
+        self._done: Dict[int, Union[Transcription, Exception]] = {}
+        self._next_id = 0
+        self._next_result = 0
+        self._started = False
+
+    def start(self):
+        """Start the workers and wait until every model is loaded."""
+        if self._started:
+            return
+        for process in self._processes:
+            process.start()
+        for _ in self._processes:
+            _kind, _result, error = self._results.get()
+            if error:
+                self.close()
+                raise RuntimeError(f"Speech worker failed to load: {error}")
+        self._started = True
+
+    def submit(self, audio: np.ndarray) -> int:
+        """Queue decoded 16 kHz float32 audio; returns its task id."""
+        self.start()
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        task_id = self._next_id
+        self._next_id += 1
+        self._blocks[task_id] = shm
+        self._tasks.put((task_id, shm.name, len(audio)))
+        return task_id
+
+    def submit_file(self, file_path: str) -> int:
+        """Decode a file in this process (ffmpeg) and queue it."""
+        return self.submit(SpeechBackend().decode(file_path))
+
+    def _collect(self):
+        task_id, transcription, error = self._results.get()
+        shm = self._blocks.pop(task_id)
+        shm.close()
+        shm.unlink()
+        # A failure is raised by next_result() when it reaches that task, not by
+        # whichever call happens to be waiting
+        self._done[task_id] = RuntimeError(f"Transcription {task_id} failed: {error}") if error else transcription
+
+    def next_result(self) -> Transcription:
+        """
+        The result of the oldest task not yet returned, waiting for it if needed.
+        Raises RuntimeError if that task failed; later tasks are unaffected.
+        """
+        if self._next_result >= self._next_id:
+            raise RuntimeError("No transcriptions pending")
+        while self._next_result not in self._done:
+            self._collect()
+        transcription = self._done.pop(self._next_result)
+        self._next_result += 1
+        if isinstance(transcription, Exception):
+            raise transcription
+        return transcription
+
+    def map(self, file_paths: Iterable[str], in_flight: Optional[int] = None) -> Iterator[Transcription]:
+        """
+        Transcribe files in order, keeping up to in_flight clips (default twice
+        the workers) decoded and queued so shared memory stays bounded.
+        """
+        in_flight = in_flight or 2 * self.workers
+        pending = 0
+        for path in file_paths:
+            self.submit_file(path)
+            pending += 1
+            if pending >= in_flight:
+                yield self.next_result()
+                pending -= 1
+        for _ in range(pending):
+            yield self.next_result()
+
+    def close(self):
+        """Stop the workers and free any shared memory still held."""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            if process.pid is not None:
+                process.join(timeout=10)
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Transcribe clips with a pool of speech worker processes")
+    arg_parser.add_argument("--clips", default="s5/*.mp3", help="Glob of audio clips")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--backend", help="Backend spec as backend[:model[:compute_type]]")
+    args = arg_parser.parse_args()
+
+    from compare_backends import parse_spec
+
+    clips = sorted(glob.glob(args.clips))
+    if not clips:
+        raise SystemExit(f"No audio clips match {args.clips}")
+    spec = parse_spec(args.backend) if args.backend else {}
+
+    with SpeechPool(args.workers, **spec) as pool:
+        start = time.perf_counter()
+        for clip, transcription in zip(clips, pool.map(clips)):
+            print(f"{clip}: {transcription.text.strip()}")
+        elapsed = time.perf_counter() - start
+    print(f"{len(clips)} clips with {pool.workers} workers in {elapsed:.2f}s ({len(clips) / elapsed:.2f} clips/s)")
@@ -0,0 +1,121 @@
+# thread_sweep.py - Find the best split of CPU cores between transcription and the LLM
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import List
+
+RESULT_MARKER = "SWEEP_RESULT "
+
+
+def run_workload(clips: List[str]) -> dict:
+    """
+    Transcribe and parse the clips pipelined, the way they contend on a shared
+    host: clip i is transcribed while clip i-1 is being parsed. Thread and
+    affinity settings come from the SARG_* environment of this process.
+    """
+    import config
+    from parse_play import parse_transcript
+    from speech import clean_transcript, get_backend, pin_cpus, standardize_transcript
+
+    # This process only transcribes and waits on Ollama, which runs in its own
+    # process, so all of it goes on the speech cores
+    pin_cpus(config.SPEECH_CPUS)
+    backend = get_backend()
+    # Warm both stages so model loading isn't timed
+    first = standardize_transcript(clean_transcript(backend.transcribe(clips[0]).text))
+    parse_transcript(first)
+
+    speech_seconds: List[float] = []
+    llm_seconds: List[float] = []
+    parse_thread = None
+
+    def parse(transcript):
+        start = time.perf_counter()
+        try:
+            parse_transcript(transcript)
+        except Exception:
+            pass  # Parse failures still cost the same time
+        llm_seconds.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for clip in clips:
+        t = time.perf_counter()
+        transcript = standardize_transcript(clean_transcript(backend.transcribe(clip).text))
+        speech_seconds.append(time.perf_counter() - t)
+        if parse_thread is not None:
+            parse_thread.join()
+        parse_thread = threading.Thread(target=parse, args=(transcript,))
+        parse_thread.start()
+    parse_thread.join()
+    wall = time.perf_counter() - start
+
+    return {
+        "wall_seconds": wall,
+        "clips_per_second": len(clips) / wall,
+        "mean_speech_seconds": sum(speech_seconds) / len(speech_seconds),
+        "mean_llm_seconds": sum(llm_seconds) / len(llm_seconds),
+    }
+
+
+def run_split(clips: List[str], speech_threads: int, llm_threads: int, cores: int) -> dict:
+    """Run the workload in a fresh process (torch thread pools can't be resized reliably)."""
+    env = dict(
+        os.environ,
+        SARG_SPEECH_THREADS=str(speech_threads),
+        SARG_SPEECH_INTEROP_THREADS="1",
+        # Speech on the first cores; Ollama is left to schedule on the rest
+        SARG_SPEECH_CPUS=f"0-{speech_threads - 1}" if speech_threads < cores else "",
+        SARG_LLM_NUM_THREAD=str(llm_threads),
+        SARG_TRACE_FILE="",
+    )
+    cmd = [sys.executable, __file__, "--worker", "--clips", *clips]
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True).stdout
+    line = next(l for l in out.splitlines() if l.startswith(RESULT_MARKER))
+    result = json.loads(line[len(RESULT_MARKER):])
+    result.update(speech_threads=speech_threads, llm_threads=llm_threads)
+    return result
+
+
+def print_report(results: List[dict]):
+    best = max(results, key=lambda r: r["clips_per_second"])
+    print(f"{'speech':>7} {'llm':>5} {'clips/s':>9} {'speech (s)':>11} {'llm (s)':>9}")
+    for r in results:
+        marker = "  <- best" if r is best else ""
+        print(
+            f"{r['speech_threads']:>7} {r['llm_threads']:>5} {r['clips_per_second']:>9.3f} "
+            f"{r['mean_speech_seconds']:>11.2f} {r['mean_llm_seconds']:>9.2f}{marker}"
+        )
+    print(f"\nBest: SARG_SPEECH_THREADS={best['speech_threads']} SARG_LLM_NUM_THREAD={best['llm_threads']}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(
+        description="Sweep thread splits between Whisper and the LLM on this host (needs ollama serve)"
+    )
+    arg_parser.add_argument("--clips", nargs="+", default=["s5/*.mp3"], help="Audio clips or globs")
+    arg_parser.add_argument("--cores", type=int, default=os.cpu_count(), help="Cores to split")
+    arg_parser.add_argument(
+        "--speech-threads", type=int, nargs="+", help="Speech thread counts to try (default: powers of two)"
+    )
+    arg_parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    clips = sorted({p for pattern in args.clips for p in glob.glob(pattern)})
+    if not clips:
+        raise SystemExit(f"No audio clips match {args.clips}")
+
+    if args.worker:
+        print(RESULT_MARKER + json.dumps(run_workload(clips)))
+    else:
+        splits = args.speech_threads or [n for n in (1, 2, 4, 8, 16, 32) if n < args.cores]
+        results = []
+        for speech_threads in splits:
+            llm_threads = max(args.cores - speech_threads, 1)
+            print(f"speech={speech_threads} llm={llm_threads} ...", flush=True)
+            results.append(run_split(clips, speech_threads, llm_threads, args.cores))
+        print_report(results)
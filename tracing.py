@@ -0,0 +1,202 @@
+# tracing.py - Wall/CPU/memory timing of each pipeline stage
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process over its lifetime (ru_maxrss is KB
+    on Linux, bytes on macOS). 0 where the resource module is missing (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class Span:
+    """One timed execution of a pipeline stage."""
+
+    stage: str
+    play_index: Optional[int]
+    started_at: float
+    wall_ms: float
+    cpu_ms: float
+    peak_rss_mb: float
+    # How much this stage raised the process's lifetime peak RSS: 0 unless the
+    # stage set a new peak, so it is not the memory the stage allocated
+    peak_rss_growth_mb: float
+    error: Optional[str] = None
+
+
+class Tracer:
+    """
+    Records a Span for every traced stage, keeps per-stage totals for the
+    Prometheus endpoint and forwards each span to the registered listeners.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self.play_index: Optional[int] = None
+        self.listeners: List[Callable[[Span], None]] = []
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._jsonl_file = None
+        self._jsonl_writer: Optional[Callable[[Span], None]] = None
+        self._exit_registered = False
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def set_play(self, index: Optional[int]):
+        """Tag following spans with the index of the play being processed."""
+        self.play_index = index
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time the body of the with-block as one execution of stage."""
+        started_at = time.time()
+        rss_before = peak_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+            rss_after = peak_rss_bytes()
+            self._record(
+                Span(
+                    stage=stage,
+                    play_index=self.play_index,
+                    started_at=started_at,
+                    wall_ms=wall_ms,
+                    cpu_ms=cpu_ms,
+                    peak_rss_mb=rss_after / 2**20,
+                    peak_rss_growth_mb=(rss_after - rss_before) / 2**20,
+                    error=error,
+                )
+            )
+
+    def _record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            totals = self.totals.setdefault(
+                span.stage, {"calls": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "last_seconds": 0.0}
+            )
+            totals["calls"] += 1
+            totals["errors"] += span.error is not None
+            totals["wall_seconds"] += span.wall_ms / 1000
+            totals["cpu_seconds"] += span.cpu_ms / 1000
+            totals["last_seconds"] = span.wall_ms / 1000
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(span)
+
+    def export_jsonl(self, path: str):
+        """
+        Append every following span to path as one JSON object per line, in
+        place of any earlier export. The file is closed by close(), at the latest on exit.
+        """
+        if not self._exit_registered:
+            atexit.register(self.close)
+            self._exit_registered = True
+        self.close()
+        jsonl_file = open(path, "a")
+
+        def write(span: Span):
+            jsonl_file.write(json.dumps(asdict(span)) + "\n")
+            jsonl_file.flush()
+
+        self._jsonl_file, self._jsonl_writer = jsonl_file, write
+        self.listeners.append(write)
+
+    def close(self):
+        """Stop the JSONL export and close its file."""
+        if self._jsonl_writer in self.listeners:
+            self.listeners.remove(self._jsonl_writer)
+        if self._jsonl_file is not None:
+            self._jsonl_file.close()
+            self._jsonl_file = None
+
+    def prometheus_text(self) -> str:
+        """Per-stage totals in the Prometheus text exposition format."""
+        lines = []
+        metrics = [
+            ("sarg_stage_calls_total", "counter", "calls", "Executions of the pipeline stage"),
+            ("sarg_stage_errors_total", "counter", "errors", "Executions that raised an exception"),
+            ("sarg_stage_wall_seconds_total", "counter", "wall_seconds", "Wall-clock time spent in the stage"),
+            ("sarg_stage_cpu_seconds_total", "counter", "cpu_seconds", "Process CPU time spent in the stage"),
+            ("sarg_stage_last_seconds", "gauge", "last_seconds", "Wall-clock time of the latest execution"),
+        ]
+        with self._lock:
+            totals = {stage: dict(values) for stage, values in self.totals.items()}
+        for name, kind, key, help_text in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, values in sorted(totals.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {values[key]}')
+        lines.append("# HELP sarg_peak_rss_bytes Peak resident set size of the process")
+        lines.append("# TYPE sarg_peak_rss_bytes gauge")
+        lines.append(f"sarg_peak_rss_bytes {peak_rss_bytes()}")
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve prometheus_text() at http://host:port/metrics from a daemon thread."""
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes out of the console
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+# Process-wide tracer used by the pipeline modules
+tracer = Tracer()
+
+
+def span(stage: str):
+    """Context manager timing a block on the process-wide tracer."""
+    return tracer.span(stage)
+
+
+def traced(stage: str):
+    """Decorator timing every call of a function as stage."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,109 @@
+# transcription_cache.py - On-disk cache of transcriptions keyed by a hash of the decoded audio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+import config
+
+
+class TranscriptionCache:
+    """
+    One JSON file per transcription (text and segments), named by the sha256 of
+    the PCM samples plus the model and decode options, so identical audio is
+    only transcribed once per model. Once the directory grows past max_bytes
+    the least recently used entries are removed (reads refresh an entry's mtime).
+    The size is kept as a running total, so the directory is only scanned when
+    it goes over max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _mtime, size, _name in self._entries())
+
+    @staticmethod
+    def key(audio, model_id: str, options: str = "") -> str:
+        digest = hashlib.sha256()
+        digest.update(audio.tobytes())
+        digest.update(b"\0" + model_id.encode() + b"\0" + options.encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(path)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        # Write to a temporary file and rename, so readers never see half an entry
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        try:
+            # An entry being replaced no longer counts
+            self.total_bytes -= os.path.getsize(path)
+        except OSError:
+            pass
+        self.total_bytes += os.path.getsize(tmp)
+        os.replace(tmp, path)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """(mtime, size, file name) of every entry on disk."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # Removed by another process meanwhile
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        # Rescanned here, so entries written or removed by other processes are counted too
+        entries = self._entries()
+        total = sum(size for _mtime, size, _name in entries)
+        if total > self.max_bytes:
+            for _mtime, size, name in sorted(entries):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self.total_bytes = total
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+        self.total_bytes = 0
+
+
+_cache: Optional[TranscriptionCache] = None
+
+
+def get_cache() -> Optional[TranscriptionCache]:
+    """The cache configured in config.py, or None when caching is disabled."""
+    global _cache
+    if not config.TRANSCRIPTION_CACHE:
+        return None
+    if _cache is None or _cache.directory != config.TRANSCRIPTION_CACHE:
+        _cache = TranscriptionCache(config.TRANSCRIPTION_CACHE, config.TRANSCRIPTION_CACHE_MB * 1024 * 1024)
+    return _cache
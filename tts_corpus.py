@@ -0,0 +1,228 @@
+# tts_corpus.py - Render simulated announcements to audio with offline TTS for speech benchmarks
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from simulator import GameSimulator
+from speech import SAMPLE_RATE
+
+MANIFEST = "manifest.jsonl"
+NOISE_KINDS = ("none", "white", "crowd")
+
+
+def find_tts() -> str:
+    """espeak-ng or espeak, whichever is installed."""
+    for name in ("espeak-ng", "espeak"):
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError("No offline TTS found: install espeak-ng (apt install espeak-ng)")
+
+
+def read_wav(path: str) -> np.ndarray:
+    """Mono 16-bit WAV as float32 PCM at SAMPLE_RATE (linear resampling if needed)."""
+    with wave.open(path, "rb") as f:
+        rate = f.getframerate()
+        channels = f.getnchannels()
+        audio = np.frombuffer(f.readframes(f.getnframes()), np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(round(len(audio) * SAMPLE_RATE / rate))
+        audio = np.interp(np.arange(n) * rate / SAMPLE_RATE, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def write_wav(path: str, audio: np.ndarray):
+    """Write float32 PCM as a 16 kHz mono 16-bit WAV."""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def synthesize(text: str, words_per_minute: int = 175, voice: str = "en-us", tts: Optional[str] = None) -> np.ndarray:
+    """Speak text with espeak and return it as float32 PCM at SAMPLE_RATE."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "speech.wav")
+        cmd = [tts or find_tts(), "-v", voice, "-s", str(words_per_minute), "-w", path, text]
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"TTS failed for {text!r}: {e.stderr.decode()}") from e
+        return read_wav(path)
+
+
+def make_noise(kind: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Background noise of n samples:
+        - white: flat broadband hiss
+        - crowd: low-passed noise with slow swells, a stand-in for stadium murmur
+    """
+    if kind == "white":
+        return rng.standard_normal(n).astype(np.float32)
+    if kind == "crowd":
+        noise = rng.standard_normal(n)
+        # One-pole low-pass (~600 Hz) as a truncated exponential kernel
+        alpha = np.exp(-2 * np.pi * 600 / SAMPLE_RATE)
+        kernel = alpha ** np.arange(256)
+        noise = np.convolve(noise, kernel, mode="same")
+        # Swells of the crowd every few seconds
+        t = np.arange(n) / SAMPLE_RATE
+        phase = rng.uniform(0, 2 * np.pi)
+        envelope = 1.0 + 0.6 * np.sin(2 * np.pi * 0.3 * t + phase)
+        return (noise * envelope).astype(np.float32)
+    raise ValueError(f"Unknown noise kind: {kind} (expected one of {NOISE_KINDS})")
+
+
+def mix(speech: np.ndarray, noise: np.ndarray, snr_db: float) -> np.ndarray:
+    """Add noise to speech scaled to the given signal-to-noise ratio."""
+    speech_power = float(np.mean(speech ** 2)) or 1e-12
+    noise_power = float(np.mean(noise ** 2)) or 1e-12
+    scale = np.sqrt(speech_power / (noise_power * 10 ** (snr_db / 10)))
+    mixed = speech + scale * noise[: len(speech)]
+    # Keep headroom so mixing never clips
+    peak = float(np.abs(mixed).max())
+    return mixed / peak * 0.9 if peak > 0.9 else mixed
+
+
+def build_corpus(
+    out_dir: str,
+    n_clips: int,
+    seed: int = 0,
+    noise: str = "crowd",
+    snr_db: float = 15.0,
+    words_per_minute: Sequence[int] = (175,),
+    voice: str = "en-us",
+) -> str:
+    """
+    Render n_clips simulated plays to WAV files in out_dir and write a manifest
+    with one line per clip: audio path, ground-truth transcript, Play label,
+    speed and noise settings. Returns the manifest path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tts = find_tts()
+    rng = np.random.default_rng(seed)
+    manifest = os.path.join(out_dir, MANIFEST)
+
+    with open(manifest, "w") as f:
+        for i, item in enumerate(GameSimulator(seed).plays(n_clips)):
+            wpm = int(words_per_minute[i % len(words_per_minute)])
+            audio = synthesize(item.transcript, wpm, voice, tts)
+            if noise != "none":
+                audio = mix(audio, make_noise(noise, len(audio), rng), snr_db)
+
+            path = os.path.join(out_dir, f"clip_{i:06d}.wav")
+            write_wav(path, audio)
+            record = {
+                "audio": path,
+                "transcript": item.transcript,
+                "play": item.play.model_dump(exclude_none=True),
+                "seconds": len(audio) / SAMPLE_RATE,
+                "words_per_minute": wpm,
+                "noise": noise,
+                "snr_db": snr_db if noise != "none" else None,
+                "seed": seed,
+                "voice": voice,
+            }
+            f.write(json.dumps(record) + "\n")
+    return manifest
+
+
+def load_manifest(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def manifest_matches(
+    records: List[dict],
+    n_clips: int,
+    seed: int,
+    noise: str,
+    snr_db: float,
+    words_per_minute: Sequence[int],
+    voice: str,
+) -> bool:
+    """Whether a manifest's clips were rendered with these build_corpus settings."""
+    if len(records) != n_clips:
+        return False
+    for i, record in enumerate(records):
+        expected = {
+            "seed": seed,
+            "voice": voice,
+            "noise": noise,
+            "snr_db": snr_db if noise != "none" else None,
+            "words_per_minute": int(words_per_minute[i % len(words_per_minute)]),
+        }
+        if any(record.get(key) != value for key, value in expected.items()):
+            return False
+    return True
+
+
+def benchmark(manifest: str, specs: List[str]) -> List[dict]:
+    """Transcribe the corpus with each backend; adds audio seconds per wall second to the compare() results."""
+    from compare_backends import compare
+
+    records = load_manifest(manifest)
+    clips = [r["audio"] for r in records]
+    references = {r["audio"]: r["transcript"] for r in records}
+    audio_seconds = sum(r["seconds"] for r in records)
+
+    runs = compare(specs, clips, references)
+    for run in runs:
+        run["audio_seconds"] = audio_seconds
+        run["realtime_factor"] = audio_seconds / run["total_seconds"] if run["total_seconds"] else None
+    return runs
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Build and benchmark a synthetic TTS audio corpus")
+    arg_parser.add_argument("--out", default="tts_corpus", help="Corpus directory")
+    arg_parser.add_argument("--clips", type=int, default=200)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--noise", choices=NOISE_KINDS, default="crowd")
+    arg_parser.add_argument("--snr", type=float, default=15.0, help="Signal-to-noise ratio in dB")
+    arg_parser.add_argument(
+        "--wpm", type=int, nargs="+", default=[175], help="Speaking rates, cycled across clips"
+    )
+    arg_parser.add_argument("--voice", default="en-us")
+    arg_parser.add_argument("--rebuild", action="store_true", help="Render the corpus again even if it matches")
+    arg_parser.add_argument(
+        "--bench",
+        nargs="*",
+        metavar="SPEC",
+        help="Transcribe the corpus with these backend specs (default: the configured backend)",
+    )
+    args = arg_parser.parse_args()
+
+    # An existing corpus is reused only if it was rendered with the same settings
+    manifest = os.path.join(args.out, MANIFEST)
+    settings = (args.clips, args.seed, args.noise, args.snr, args.wpm, args.voice)
+    if (
+        not args.rebuild
+        and os.path.exists(manifest)
+        and manifest_matches(load_manifest(manifest), *settings)
+    ):
+        print(f"Reusing the {args.clips} clips in {args.out} (--rebuild to render them again)")
+    else:
+        manifest = build_corpus(args.out, *settings)
+        print(f"Wrote {args.clips} clips to {args.out}")
+
+    if args.bench is not None:
+        import config
+        from compare_backends import print_report
+
+        specs = args.bench or [f"{config.SPEECH_BACKEND}:{config.SPEECH_MODEL}:{config.SPEECH_COMPUTE_TYPE}"]
+        runs = benchmark(manifest, specs)
+        print_report(runs)
+        for run in runs:
+            print(f"{run['spec']}: {run['realtime_factor']:.1f}x realtime over {run['audio_seconds']:.0f}s of audio")
@@ -75,6 +75,12 @@ class GameGUI(QWidget):
         self.batter_label = QLabel()
         self.layout.addWidget(self.batter_label)
 
+        # Speculative preview of the play being announced
+        self.preview_label = QLabel("")
+        self.preview_label.setStyleSheet("color: #A0A0A0; font-size: 14px;")
+        self.preview_label.setWordWrap(True)
+        self.layout.addWidget(self.preview_label)
+
         # Batter management section
         self.batter_input = QLineEdit()
         self.batter_input.setPlaceholderText("Enter batter name")
@@ -148,32 +154,31 @@ class GameGUI(QWidget):
         )
 
     def update_display(self):
-        """Update all labels based on current game state."""
+        """Update all labels from the latest published game snapshot."""
+        # One snapshot per refresh, so every label shows the same state
+        snap = self.game_state.published
+
         # Score
         self.score_label.setText(
-            f"{self.game_state.away.name}: {self.game_state.get_away_score()}  |  "
-            f"{self.game_state.home.name}: {self.game_state.get_home_score()}"
+            f"{snap.away_team}: {snap.away_score}  |  "
+            f"{snap.home_team}: {snap.home_score}"
         )
 
         # Inning
-        inning_half = "Top" if self.game_state.inning.top else "Bottom"
-        inning_number = self.game_state.inning.number
-        self.inning_label.setText(f"Inning: {inning_half} {inning_number}")
+        inning_half = "Top" if snap.top else "Bottom"
+        self.inning_label.setText(f"Inning: {inning_half} {snap.inning}")
 
         # Outs
-        self.outs_label.setText(f"Outs: {self.game_state.outs}")
+        self.outs_label.setText(f"Outs: {snap.outs}")
 
         # Count (balls-strikes) - NOW PROPERLY DISPLAYED
-        balls = self.game_state.balls
-        strikes = self.game_state.strikes
-        self.count_label.setText(f"Count: {balls}-{strikes}")
+        self.count_label.setText(f"Count: {snap.balls}-{snap.strikes}")
 
         # Bases
-        bases_state = self.game_state.bases.snapshot()
         bases_text = (
-            f"1st: {bases_state['first'] or 'empty'}, "
-            f"2nd: {bases_state['second'] or 'empty'}, "
-            f"3rd: {bases_state['third'] or 'empty'}"
+            f"1st: {snap.runner('first') or 'empty'}, "
+            f"2nd: {snap.runner('second') or 'empty'}, "
+            f"3rd: {snap.runner('third') or 'empty'}"
         )
         self.bases_label.setText(f"Bases: {bases_text}")
 
@@ -188,16 +193,21 @@ class GameGUI(QWidget):
         self.batter_label.setText(f"Batter: {batter_name}")
 
         # Update play history display
-        self.update_play_history()
+        self.update_play_history(snap)
 
     def refresh_after_play(self, play):
         """Call after each play is applied to update UI."""
+        self.preview_label.setText("")
         self.update_display()
 
-    def update_play_history(self):
+    def show_preview(self, text: str):
+        """Show a play that is still being announced (see speculative.py)."""
+        self.preview_label.setText(text)
+
+    def update_play_history(self, snap=None):
         """Update the visual display of recent plays."""
-        plays = self.game_state.get_last_n_plays(3)
-        history_text = "\n".join(plays)
+        snap = snap or self.game_state.published
+        history_text = "\n".join(snap.recent_plays)
         self.play_history_display.setText(history_text)
 
     def undo_last_play(self):